@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 {
     'name': 'CRM Customisation',
-    'version': '18.0.1.0.0',
+    'version': '18.0.1.2.0',
     'summary': 'Auto sequence for CRM Opportunities',
     'description': '''
         Detailed description of the module
@@ -17,12 +17,14 @@
         "security/ir.model.access.csv",
         "security/ecpl_security.xml",
         "data/ir_sequence_data.xml",
+        "data/res_partner_pincode_data.xml",
         "data/reminder_email_cron.xml",
         "data/manufacturing_reminder_email.xml",
         # "data/email_template_crm_delivery_request.xml",X
         "views/crm_lead_views.xml",
         "views/res_config_settings_view.xml",
         "views/res_partner_view.xml",
+        "views/res_partner_pincode_view.xml",
         "views/product_category_view.xml",
         "views/product_template_view.xml",
         "views/mrp_views.xml",
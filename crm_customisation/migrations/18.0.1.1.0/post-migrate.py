@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+def migrate(cr, version):
+    """Backfill the now stored mrp.production.sale_order_id from the MO origin,
+    which is how the former non-stored compute resolved it."""
+    if not version:
+        return
+    cr.execute("""
+        UPDATE mrp_production mo
+           SET sale_order_id = so.id
+          FROM (
+                SELECT DISTINCT ON (name) id, name
+                  FROM sale_order
+              ORDER BY name, id DESC
+          ) so
+         WHERE mo.origin = so.name
+           AND mo.sale_order_id IS NULL
+    """)
+    _logger.info("Linked %s manufacturing orders to their sale order", cr.rowcount)
@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+def migrate(cr, version):
+    """Create and fill the newly stored material totals in SQL, so the ORM
+    does not recompute them record by record when the module is updated."""
+    if not version:
+        return
+    cr.execute("""
+        ALTER TABLE crm_material_line ADD COLUMN IF NOT EXISTS total_price numeric;
+        UPDATE crm_material_line
+           SET total_price = COALESCE(quantity, 0) * COALESCE(price, 0);
+
+        ALTER TABLE crm_lead ADD COLUMN IF NOT EXISTS material_line_count integer;
+        ALTER TABLE crm_lead ADD COLUMN IF NOT EXISTS material_total numeric;
+        UPDATE crm_lead lead
+           SET material_line_count = COALESCE(agg.line_count, 0),
+               material_total = COALESCE(agg.total, 0)
+          FROM crm_lead l
+     LEFT JOIN (
+                SELECT lead_id, COUNT(*) AS line_count, SUM(total_price) AS total
+                  FROM crm_material_line
+                 WHERE lead_id IS NOT NULL
+              GROUP BY lead_id
+          ) agg ON agg.lead_id = l.id
+         WHERE lead.id = l.id
+    """)
+    _logger.info("Stored material totals on %s leads", cr.rowcount)
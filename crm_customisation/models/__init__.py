@@ -4,6 +4,7 @@ from . import crm_lead
 from . import crm_lead_line
 from . import sale_order_line
 from . import res_partner
+from . import res_partner_pincode
 from . import raisin_type
 from . import product_template
 from . import mrp_production
@@ -3,6 +3,7 @@
 from odoo import api, fields, models
 import json
 import logging
+import re
 
 _logger = logging.getLogger(__name__)
 
@@ -25,6 +26,18 @@ class CrmLead(models.Model):
         string="Materials",
         copy=True,
     )
+    material_line_count = fields.Integer(
+        string="Material Lines",
+        compute='_compute_material_totals',
+        store=True,
+    )
+    material_total = fields.Monetary(
+        string="Material Value",
+        currency_field='company_currency',
+        compute='_compute_material_totals',
+        store=True,
+        index=True,
+    )
     
     company_contact_ids = fields.One2many(
         comodel_name="res.partner",
@@ -36,6 +49,25 @@ class CrmLead(models.Model):
     )
 
 
+    @api.depends('material_line_ids.total_price')
+    def _compute_material_totals(self):
+        """Aggregated in SQL when every lead is saved, from the cache in onchanges"""
+        if all(isinstance(lead_id, int) for lead_id in self.ids):
+            totals = {
+                lead.id: (count, total)
+                for lead, count, total in self.env['crm.material.line']._read_group(
+                    [('lead_id', 'in', self.ids)],
+                    ['lead_id'],
+                    ['__count', 'total_price:sum'],
+                )
+            }
+            for lead in self:
+                lead.material_line_count, lead.material_total = totals.get(lead.id, (0, 0.0))
+            return
+        for lead in self:
+            lead.material_line_count = len(lead.material_line_ids)
+            lead.material_total = sum(lead.material_line_ids.mapped('total_price'))
+
     def action_new_quotation(self):
         """Create quotation with spreadsheet data transfer"""
         action = super(CrmLead, self).action_new_quotation()
@@ -165,6 +197,7 @@ class CrmLead(models.Model):
                     continue
             
             #  Process ALL sheets from CRM
+            rewriter = self._get_formula_rewriter(id_mapping, FIELD_MAP)
             sales_sheets = []
             crm_sheets = crm_data.get('sheets', [])
             
@@ -182,7 +215,7 @@ class CrmLead(models.Model):
                             
                             if sales_line_id:
                                 new_sheet = self._create_complete_sheet_copy(
-                                    sheet, sales_line_id, id_mapping, FIELD_MAP
+                                    sheet, sales_line_id, id_mapping, FIELD_MAP, rewriter
                                 )
                                 sales_sheets.append(new_sheet)
                             else:
@@ -219,81 +252,86 @@ class CrmLead(models.Model):
         
 
 
-    def _create_complete_sheet_copy(self, original_sheet, sales_line_id, id_mapping, field_map):
-        """Create a complete copy of a sheet with updated references"""
-        # Copy ALL sheet properties
-        new_sheet = original_sheet.copy()
+    def _create_complete_sheet_copy(self, original_sheet, sales_line_id, id_mapping, field_map, rewriter=None):
+        """Copy a sheet with updated references. Cells whose content does
+        not change are shared with the original sheet, not copied."""
+        if rewriter is None:
+            rewriter = self._get_formula_rewriter(id_mapping, field_map)
+
+        # Copy sheet properties, nested structures stay shared
+        new_sheet = dict(original_sheet)
         
         # Update sheet ID
         new_sheet['id'] = f"sheet_sales_{sales_line_id}"
         new_sheet['name'] = original_sheet.get('name', f'Sales Item {sales_line_id}')[:31]
         
         # Update cells with formulas and field references
-        new_cells = {}
-        for cell_ref, cell_data in original_sheet.get('cells', {}).items():
-            new_cell_data = cell_data.copy()
-            
-            # Update formulas with new IDs and field names
-            content = cell_data.get('content', '')
-            if content and isinstance(content, str):
-                updated_content = self._update_formula_references(content, id_mapping, field_map)
-                new_cell_data['content'] = updated_content
-            
-            new_cells[cell_ref] = new_cell_data
-        
-        new_sheet['cells'] = new_cells
+        new_sheet['cells'] = dict(self._iter_converted_cells(original_sheet.get('cells', {}), rewriter))
         
         # Update fieldSyncs with new list IDs and field names
         new_field_syncs = {}
         for cell_ref, field_sync in original_sheet.get('fieldSyncs', {}).items():
-            new_field_sync = field_sync.copy()
             old_list_id = field_sync.get('listId')
-            
-            if old_list_id and old_list_id in id_mapping:
-                new_field_sync['listId'] = id_mapping[old_list_id]
-            
-            # Update field name in fieldSync
             old_field_name = field_sync.get('fieldName')
-            if old_field_name and old_field_name in field_map:
-                new_field_sync['fieldName'] = field_map[old_field_name]
-            
-            new_field_syncs[cell_ref] = new_field_sync
+            new_list_id = id_mapping.get(old_list_id, old_list_id) if old_list_id else old_list_id
+            new_field_name = field_map.get(old_field_name, old_field_name) if old_field_name else old_field_name
+
+            if new_list_id == old_list_id and new_field_name == old_field_name:
+                new_field_syncs[cell_ref] = field_sync
+            else:
+                new_field_syncs[cell_ref] = dict(field_sync, listId=new_list_id, fieldName=new_field_name)
         
         new_sheet['fieldSyncs'] = new_field_syncs
         
         return new_sheet
 
+    def _iter_converted_cells(self, cells, rewriter):
+        """Yield (cell_ref, cell) pairs, copying only the cells whose formula
+        references an old list id or field"""
+        for cell_ref, cell_data in cells.items():
+            content = cell_data.get('content') if isinstance(cell_data, dict) else None
+            if (
+                isinstance(content, str)
+                and content.startswith('=')
+                and ('ODOO.' in content or '"' in content or ',' in content)
+            ):
+                updated_content = rewriter(content)
+                if updated_content != content:
+                    cell_data = dict(cell_data, content=updated_content)
+            yield cell_ref, cell_data
+
+    def _get_formula_rewriter(self, id_mapping, field_map):
+        """Compile the reference updates of a conversion into a single-pass
+        substitution, returns a function rewriting one formula"""
+        id_mapping = {old: new for old, new in id_mapping.items() if old != new}
+        field_map = {old: new for old, new in field_map.items() if old != new}
+        if not id_mapping and not field_map:
+            return lambda content: content
+
+        def alternation(keys):
+            return '|'.join(re.escape(key) for key in sorted(keys, key=len, reverse=True)) or '(?!)'
+
+        ids = alternation(id_mapping)
+        fields_ = alternation(field_map)
+        pattern = re.compile(
+            rf'(?P<function>ODOO\.LIST(?:\.HEADER)?\()(?P<list_id>{ids})(?=,)'
+            rf'|"(?P<quoted>{ids}|{fields_})"'
+            rf'|(?<=,)(?P<field>{fields_})(?=[,)])'
+        )
+
+        def replace(match):
+            if match.group('list_id') is not None:
+                return match.group('function') + id_mapping[match.group('list_id')]
+            quoted = match.group('quoted')
+            if quoted is not None:
+                return f'"{id_mapping.get(quoted, field_map.get(quoted, quoted))}"'
+            return field_map[match.group('field')]
+
+        return lambda content: pattern.sub(replace, content)
+
     def _update_formula_references(self, content, id_mapping, field_map):
         """Update formula references to new list IDs and field names"""
-        updated_content = content
-        
-        # Replace list IDs in ODOO formulas
-        for old_id, new_id in id_mapping.items():
-            # Handle ODOO.LIST.HEADER references
-            updated_content = updated_content.replace(
-                f'ODOO.LIST.HEADER({old_id},', 
-                f'ODOO.LIST.HEADER({new_id},'
-            )
-            # Handle ODOO.LIST references
-            updated_content = updated_content.replace(
-                f'ODOO.LIST({old_id},', 
-                f'ODOO.LIST({new_id},'
-            )
-            # Handle direct ID references
-            updated_content = updated_content.replace(
-                f'"{old_id}"', 
-                f'"{new_id}"'
-            )
-        
-        # Replace field names in formulas
-        for old_field, new_field in field_map.items():
-            # Handle quoted field names
-            updated_content = updated_content.replace(f'"{old_field}"', f'"{new_field}"')
-            # Handle unquoted field names in specific patterns
-            updated_content = updated_content.replace(f",{old_field},", f",{new_field},")
-            updated_content = updated_content.replace(f",{old_field})", f",{new_field})")
-        
-        return updated_content
+        return self._get_formula_rewriter(id_mapping, field_map)(content)
 
     def _create_complete_line_id_mapping(self, sale_order):
         """Create COMPLETE mapping for ALL material lines"""
@@ -387,109 +425,48 @@ class CrmLead(models.Model):
         
         return mapping
     
-    def _create_sales_spreadsheet_with_data(self, sale_order):
-        """Create sales spreadsheet with converted CRM data - FULLY FIXED"""
-        self.ensure_one()
-        
-        _logger.info(f"\n🔵 [CREATE SALES SPREADSHEET] Starting for Lead {self.id}, Order {sale_order.id}")
-        
-        # ✅ STEP 1: Find CRM spreadsheet
-        crm_spreadsheet = self.env['crm.lead.spreadsheet'].search([
-            ('lead_id', '=', self.id)
-        ], limit=1)
-        
-        if not crm_spreadsheet:
-            _logger.warning(f"⚠️ No CRM spreadsheet found for lead {self.id}")
-            return False
-            
-        if not crm_spreadsheet.exists():
-            _logger.warning(f"⚠️ CRM spreadsheet was deleted for lead {self.id}")
-            return False
-            
-        if not crm_spreadsheet.raw_spreadsheet_data:
-            _logger.warning(f"⚠️ CRM spreadsheet {crm_spreadsheet.id} has no data")
-            return False
-        
-        _logger.info(f"✅ Found CRM spreadsheet: {crm_spreadsheet.id}")
-        
-        # ✅ STEP 2: Convert CRM data to Sales format
-        try:
-            sales_data_json = self._convert_crm_spreadsheet_to_sales(crm_spreadsheet, sale_order)
-        except Exception as conv_error:
-            _logger.error(f"❌ CRM data conversion failed: {conv_error}", exc_info=True)
-            return False
-            
-        if not sales_data_json:
-            _logger.warning(f"⚠️ CRM data conversion returned empty")
-            return False
-        
-        _logger.info(f"✅ Converted CRM data to Sales format ({len(sales_data_json)} chars)")
-        
-        # ✅ STEP 3: Check if Sales spreadsheet already exists
-        existing_spreadsheet = self.env['sale.order.spreadsheet'].search([
-            ('order_id', '=', sale_order.id)
-        ], limit=1)
-        
-        if existing_spreadsheet:
-            _logger.info(f"ℹ️ Sales spreadsheet {existing_spreadsheet.id} already exists, updating...")
-            try:
-                existing_spreadsheet.raw_spreadsheet_data = sales_data_json
-                
-                # Link CRM spreadsheet
-                if crm_spreadsheet.exists():
-                    crm_spreadsheet.sale_id = sale_order.id
-                    
-                _logger.info(f"✅ Updated existing spreadsheet {existing_spreadsheet.id}")
-                return existing_spreadsheet
-                
-            except Exception as e:
-                _logger.error(f"❌ Failed to update spreadsheet: {e}", exc_info=True)
-                return False
-        
-        # ✅ STEP 4: Create new Sales spreadsheet
-        try:
-            sales_spreadsheet = self.env['sale.order.spreadsheet'].create({
-                'name': f"{sale_order.name} - Calculator",
-                'order_id': sale_order.id,
-                'raw_spreadsheet_data': sales_data_json,
-            })
-            
-            # Commit to ensure it exists
-            self.env.cr.commit()
-            
-            _logger.info(f"✅ Created Sales spreadsheet: {sales_spreadsheet.id}")
-            
-            # ✅ STEP 5: Link CRM spreadsheet to Sale Order
-            if crm_spreadsheet.exists():
-                try:
-                    crm_spreadsheet.sale_id = sale_order.id
-                    self.env.cr.commit()
-                    _logger.info(f"✅ Linked CRM spreadsheet {crm_spreadsheet.id} to Sale {sale_order.id}")
-                except Exception as e:
-                    _logger.error(f"⚠️ Failed to link CRM spreadsheet: {e}")
-                    # Don't fail the whole operation
-            
-            return sales_spreadsheet
-            
-        except Exception as e:
-            _logger.error(f"❌ Failed to create Sales spreadsheet: {e}", exc_info=True)
-            # Rollback if creation failed
-            self.env.cr.rollback()
-            return False
+    @api.model_create_multi
+    def create(self, vals_list):
+        """Opportunity sequence generation, reserved in one block for the batch"""
+        default_type = self.default_get(['type']).get('type')
+        to_number = [
+            vals for vals in vals_list
+            if vals.get('type', default_type) in (False, 'opportunity')
+            and not vals.get('opportunity_sequence')
+        ]
+        if to_number:
+            numbers = self._reserve_opportunity_sequences(len(to_number))
+            for vals, number in zip(to_number, numbers):
+                vals['opportunity_sequence'] = number
+
+        return super().create(vals_list)
 
     @api.model
-    def create(self, vals):
-        """Opportunity sequence generation"""
-        seq_obj = self.env["ir.sequence"]
-        seq_code = "crm.opportunity.custom.seq"
+    def _reserve_opportunity_sequences(self, count):
+        """Return `count` formatted opportunity numbers.
 
-        lead = super().create(vals)
+        Standard sequences without date ranges are drawn from their PostgreSQL
+        sequence in a single query; other implementations fall back on one
+        `next_by_id` per number.
+        """
+        seq_code = "crm.opportunity.custom.seq"
+        company_id = self.env.company.id
+        sequence = self.env['ir.sequence'].sudo().search([
+            ('code', '=', seq_code),
+            ('company_id', 'in', [company_id, False]),
+        ], order='company_id', limit=1)
+        if not sequence:
+            return [False] * count
 
-        is_opportunity = (vals.get("type") in (False, "opportunity")) or (lead.type in (False, "opportunity"))
-        if is_opportunity and not lead.opportunity_sequence:
-            lead.opportunity_sequence = seq_obj.next_by_code(seq_code) or False
+        sequence = sequence.with_company(company_id)
+        if sequence.implementation != 'standard' or sequence.use_date_range:
+            return [sequence.next_by_id() for _i in range(count)]
 
-        return lead
+        self.env.cr.execute(
+            "SELECT nextval(%s) FROM generate_series(1, %s)",
+            ['ir_sequence_%03d' % sequence.id, count],
+        )
+        return [sequence.get_next_char(number) for number, in self.env.cr.fetchall()]
 
     def write(self, vals):
         ctx = self.env.context
@@ -501,4 +478,17 @@ class CrmLead(models.Model):
                 elif command[0] != 0:
                     filtered_lines.append(command)
             vals['material_line_ids'] = filtered_lines
-        return super().write(vals)
\ No newline at end of file
+
+        # Spreadsheet saves send one UPDATE command per line, apply them
+        # together; mixed command lists keep their order and go through as is
+        line_updates = {}
+        commands = vals.get('material_line_ids') or []
+        if len(commands) > 1 and all(command[0] == 1 and command[2] for command in commands):
+            for command in commands:
+                line_updates.setdefault(command[1], {}).update(command[2])
+            del vals['material_line_ids']
+
+        res = super().write(vals)
+        if line_updates:
+            self.env['crm.material.line']._write_grouped(line_updates)
+        return res
\ No newline at end of file
@@ -1,6 +1,9 @@
 # -*- coding: utf-8 -*-
+import json
+
 from odoo import api, fields, models
 from odoo.exceptions import ValidationError
+from odoo.tools import SQL
 
 import logging
 _logger = logging.getLogger(__name__) 
@@ -38,7 +41,13 @@ class CrmMaterialLine(models.Model):
     readonly=True,
     )
     price = fields.Float(string = "Price")
-    total_price = fields.Float(string ="Total Price" , readonly=True ,compute = "compute_total_price")
+    total_price = fields.Monetary(
+        string="Total Price",
+        currency_field='currency_id',
+        compute="compute_total_price",
+        store=True,
+        readonly=True,
+    )
 
     product_template_id = fields.Many2one(
         'product.template',
@@ -196,13 +205,18 @@ class CrmMaterialLine(models.Model):
 
     @api.onchange('product_template_id', 'product_template_attribute_value_ids','product_id')
     def _onchange_product_template_or_attributes(self):
+        # one variant lookup per template for all its lines
+        variants = {}
+        for template in self.product_template_id:
+            lines = self.filtered(lambda l: l.product_template_id == template)
+            variants.update(zip(lines, template._get_variants_for_combinations(
+                [line.product_template_attribute_value_ids for line in lines]
+            )))
         for line in self:
             if not line.product_template_id:
                 line.product_id = False
                 continue
-            product = line.product_template_id._get_variant_for_combination(
-                line.product_template_attribute_value_ids
-            )
+            product = variants[line]
             if product:
                 _logger.info(" Found variant: %s", product.id)
             else:
@@ -216,21 +230,21 @@ class CrmMaterialLine(models.Model):
 
     def unlink(self):
         """Trigger sheet deletion before material lines are deleted"""
-        # Store references before deletion
-        spreadsheets_to_update = []
-        line_ids_to_delete = []
-        
+        # Store references before deletion: the deleted line ids of each lead
+        line_ids_by_lead = {}
         for record in self:
             if record.lead_id and record.lead_id.spreadsheet_ids:
-                spreadsheets_to_update.extend(record.lead_id.spreadsheet_ids)
-                line_ids_to_delete.append(record.id)
+                line_ids_by_lead.setdefault(record.lead_id, []).append(record.id)
         
         res = super().unlink()
         
-        # Delete sheets after successful deletion
-        for spreadsheet in set(spreadsheets_to_update):
-            for line_id in line_ids_to_delete:
-                spreadsheet._delete_sheet_for_material_line(line_id)
+        # Delete sheets after successful deletion, one revision per spreadsheet
+        for lead, line_ids in line_ids_by_lead.items():
+            for spreadsheet in lead.spreadsheet_ids:
+                if spreadsheet.sheet_layout == 'consolidated':
+                    spreadsheet._sync_sheets_with_material_lines()
+                else:
+                    spreadsheet._delete_sheets_for_material_lines(line_ids)
         
         return res
 
@@ -261,19 +275,6 @@ class CrmMaterialLine(models.Model):
                     standard_vals['attributes_json'] = existing_json
                 else:
                     standard_vals['attributes_json'] = dynamic_updates
-                
-                # Also set attributes_description
-                attribute_lines = []
-                for attr_name, attr_value in dynamic_updates.items():
-                    attribute_lines.append(f"{attr_name}: {attr_value}")
-                
-                # Append to existing description if present
-                current_desc = standard_vals.get('attributes_description', "")
-                new_desc = ", ".join(attribute_lines)
-                if current_desc:
-                    standard_vals['attributes_description'] = f"{current_desc}, {new_desc}"
-                else:
-                    standard_vals['attributes_description'] = new_desc
             
             processed_vals_list.append(standard_vals)
         
@@ -281,69 +282,105 @@ class CrmMaterialLine(models.Model):
         records = super().create(processed_vals_list)
         
         # Trigger sync for related spreadsheets
-        for record in records:
-            if record.lead_id and record.lead_id.spreadsheet_ids:
-                for spreadsheet in record.lead_id.spreadsheet_ids:
-                    # Create sheet for the new line
-                    spreadsheet.with_context(material_line_id=record.id)._dispatch_insert_list_revision()
+        consolidated = records.lead_id.spreadsheet_ids.filtered(lambda s: s.sheet_layout == 'consolidated')
+        for lead in records.lead_id:
+            lead_records = records.filtered(lambda r: r.lead_id == lead)
+            for spreadsheet in lead.spreadsheet_ids - consolidated:
+                # Create the sheets of the new lines in one revision
+                spreadsheet._dispatch_insert_lists_revision(lead_records)
+        # Consolidated calculators rebuild the layouts once for all new lines
+        for spreadsheet in consolidated:
+            spreadsheet._sync_sheets_with_material_lines()
         
         return records
 
 
-    def write(self, vals):
-        """✅ FIXED: Properly handle dynamic attributes from spreadsheet"""
-        _logger.info(f"🔵 write() called with vals: {vals}")
-        
-        # Separate standard and dynamic fields
-        dynamic_updates = {}
+    @api.model
+    def _split_dynamic_vals(self, vals):
+        """Split write values into model fields and dynamic spreadsheet attributes"""
         standard_vals = {}
-        
-        # List of actual model fields
-        model_fields = set(self._fields.keys())
-        _logger.info(f"📋 Model fields: {model_fields}")
-        
+        dynamic_updates = {}
         for field, value in vals.items():
-            if field in model_fields:
-                # Standard field - write directly
+            if field in self._fields:
                 standard_vals[field] = value
-                _logger.info(f"✅ Standard field: {field} = {value}")
             else:
-                # Dynamic attribute - store in attributes_json
                 dynamic_updates[field] = value
-                _logger.info(f"🔵 Dynamic field: {field} = {value}")
-        
-        # First write standard fields
-        if standard_vals:
-            res = super().write(standard_vals)
-        else:
-            res = True
-        
-        # Then handle dynamic attributes
+        return standard_vals, dynamic_updates
+
+    @api.model
+    def _merge_attributes_json(self, updates_by_id):
+        """Merge dynamic attributes into attributes_json in a single statement.
+
+        :param dict updates_by_id: {line_id: {attribute: value}}; lines that
+            receive the same update share a single VALUES row.
+        """
+        ids_by_update = {}
+        for line_id, updates in updates_by_id.items():
+            key = json.dumps(updates, sort_keys=True, default=str)
+            ids_by_update.setdefault(key, []).append(line_id)
+        if not ids_by_update:
+            return
+
+        lines = self.browse(list(updates_by_id))
+        # pending recomputations would overwrite the merged values on flush
+        lines.flush_recordset(['attributes_json'])
+        self.env.cr.execute(SQL(
+            """
+            UPDATE crm_material_line AS line
+               SET attributes_json = COALESCE(line.attributes_json, '{}'::jsonb) || upd.attrs,
+                   write_uid = %s,
+                   write_date = (now() at time zone 'UTC')
+              FROM (VALUES %s) AS upd(ids, attrs)
+             WHERE line.id = ANY(upd.ids)
+            """,
+            self.env.uid,
+            SQL(", ").join(
+                SQL("(%s::int[], %s::jsonb)", line_ids, key)
+                for key, line_ids in ids_by_update.items()
+            ),
+        ))
+        lines.invalidate_recordset(['attributes_json', 'write_uid', 'write_date'])
+        lines.modified(['attributes_json'])
+
+    @api.model
+    def _write_grouped(self, vals_by_id):
+        """Apply per-line values (e.g. a spreadsheet save) with one write per
+        distinct set of standard values, one statement for all dynamic
+        attributes and one sync per spreadsheet"""
+        ids_by_vals = {}
+        dynamic_by_id = {}
+        for line_id, vals in vals_by_id.items():
+            standard_vals, dynamic_updates = self._split_dynamic_vals(vals)
+            if standard_vals:
+                key = repr(sorted(standard_vals.items()))
+                ids_by_vals.setdefault(key, (standard_vals, []))[1].append(line_id)
+            if dynamic_updates:
+                dynamic_by_id[line_id] = dynamic_updates
+
+        lines = self.browse(list(vals_by_id)).exists()
+        for standard_vals, line_ids in ids_by_vals.values():
+            (self.browse(line_ids) & lines).with_context(skip_sheet_sync=True).write(standard_vals)
+        self._merge_attributes_json({
+            line_id: updates for line_id, updates in dynamic_by_id.items() if line_id in lines.ids
+        })
+        lines._sync_lead_spreadsheets()
+        return True
+
+    def _sync_lead_spreadsheets(self):
+        if self.env.context.get('skip_sheet_sync'):
+            return
+        for spreadsheet in self.lead_id.spreadsheet_ids:
+            spreadsheet._sync_sheets_with_material_lines()
+
+    def write(self, vals):
+        """Handle dynamic attributes coming from the spreadsheet"""
+        standard_vals, dynamic_updates = self._split_dynamic_vals(vals)
+
+        res = super().write(standard_vals) if standard_vals else True
         if dynamic_updates:
-            for record in self:
-                # Update attributes_json
-                current_map = record.attributes_json or {}
-                current_map.update(dynamic_updates)
-                
-                # Update attributes_description
-                attribute_lines = []
-                for attr_name, attr_value in current_map.items():
-                    attribute_lines.append(f"{attr_name}: {attr_value}")
-                
-                # Write attribute fields using super to avoid recursion
-                super(CrmMaterialLine, record).write({
-                    'attributes_json': current_map,
-                    'attributes_description': ", ".join(attribute_lines)
-                })
-                
-                _logger.info(f"✅ Updated attributes for record {record.id}: {current_map}")
-        
-        # Trigger spreadsheet sync
-        for record in self:
-            if record.lead_id and record.lead_id.spreadsheet_ids:
-                for spreadsheet in record.lead_id.spreadsheet_ids:
-                    spreadsheet._sync_sheets_with_material_lines()
-        
+            self._merge_attributes_json(dict.fromkeys(self.ids, dynamic_updates))
+
+        self._sync_lead_spreadsheets()
         return res
     
     @api.model
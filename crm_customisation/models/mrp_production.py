@@ -1,11 +1,15 @@
+from collections import defaultdict
 from datetime import timedelta, datetime, time
 from odoo import models, fields, api
 from odoo.exceptions import ValidationError
 
 import logging
+import threading
 
 _logger = logging.getLogger(__name__)
 
+REMINDER_BATCH_SIZE = 200
+
 
 class MrpProduction(models.Model):
     _inherit = "mrp.production"
@@ -21,16 +25,18 @@ class MrpProduction(models.Model):
         string="Raisin Product",
         domain="[('categ_id.is_raisin', '=', True)]",
     )
-    sale_order_id = fields.Many2one('sale.order', compute="_compute_sale_order", store=False)
+    sale_order_id = fields.Many2one(
+        'sale.order',
+        string="Sale Order",
+        index='btree_not_null',
+        copy=False,
+        readonly=True,
+        help="Sale order this MO was procured for, set from the procurement values.",
+    )
     ask_for_delivery_date = fields.Boolean(string="Ask for Delivery Date",readonly=True)
     delivery_date = fields.Date(string="Expected Delivery Date", readonly=True)
     email_reminder_sent = fields.Boolean(string="Email Reminder Sent", default=False)
     
-    def _compute_sale_order(self):
-        for mo in self:
-            mo.sale_order_id = self.env['sale.order'].search([('name', '=', mo.origin)], limit=1)
-
-
     @api.onchange('raisin_product_id')
     def _onchange_raisin_product_id(self):
         """Auto fetch Raisin Type when Raisin Product is selected."""
@@ -50,10 +56,27 @@ class MrpProduction(models.Model):
                 if product and product.categ_id and product.categ_id.is_raisin:
                     vals["raisin_product_id"] = product.id
 
+        # MOs not created through a sale procurement: link them by origin
+        origins = {
+            vals['origin'] for vals in vals_list
+            if vals.get('origin') and not vals.get('sale_order_id')
+        }
+        if origins:
+            orders_by_name = {}
+            for order in self.env['sale.order'].search([('name', 'in', list(origins))]):
+                orders_by_name.setdefault(order.name, order.id)
+            for vals in vals_list:
+                if vals.get('origin') and not vals.get('sale_order_id'):
+                    vals['sale_order_id'] = orders_by_name.get(vals['origin'], False)
+
         return super().create(vals_list)
 
-    def send_mo_reminder_email(self):
+    def send_mo_reminder_email(self, batch_size=REMINDER_BATCH_SIZE):
+        """Queue reminder emails for the MOs finishing in `reminder_days` days.
 
+        MOs are processed in chunks that are committed one by one, so a crash
+        or timeout resumes with the MOs that were not flagged yet.
+        """
         # Fetch settings safely
         IrConfig = self.env['ir.config_parameter'].sudo()
         enable_reminder = IrConfig.get_param('crm_customisation.enable_reminder', 'False') == 'True'
@@ -72,33 +95,53 @@ class MrpProduction(models.Model):
         start_dt = fields.Datetime.context_timestamp(self.with_context(tz=user_tz), start_dt_local)
         end_dt = fields.Datetime.context_timestamp(self.with_context(tz=user_tz), end_dt_local)
 
+        template = self.env.ref('crm_customisation.email_template_mo_reminder', raise_if_not_found=False)
+        if not template:
+            return
+
         mos = self.env['mrp.production'].search([
             ('state', '=', 'confirmed'),
             ('date_finished', '>=', start_dt),
             ('date_finished', '<=', end_dt),
-            ('origin', '!=', False),
+            ('sale_order_id', '!=', False),
             ('email_reminder_sent', '=', False),
-        ])
+        ], order='id')
 
-
-        template = self.env.ref('crm_customisation.email_template_mo_reminder', raise_if_not_found=False)
-        if not template:
-            return
-
-        for mo in mos:
-            so = self.env['sale.order'].search([('name', '=', mo.origin)], limit=1)
+        auto_commit = not getattr(threading.current_thread(), 'testing', False)
+        done = 0
+        for start in range(0, len(mos), batch_size):
+            batch = mos[start:start + batch_size]
+            try:
+                with self.env.cr.savepoint():
+                    batch._send_reminder_batch(template)
+            except Exception:
+                _logger.exception("MO reminder failed for MOs %s, continuing with the next batch", batch.ids)
+            done += len(batch)
+            self.env['ir.cron']._notify_progress(done=done, remaining=len(mos) - done)
+            if auto_commit:
+                self.env.cr.commit()
+
+    def _send_reminder_batch(self, template):
+        """Queue the reminders of `self` and flag the MOs that got one.
+
+        Emails are rendered in bulk per salesperson into the mail queue.
+        """
+        mos_by_email = defaultdict(lambda: self.browse())
+        for mo in self:
+            so = mo.sale_order_id
             if not so or not so.user_id or not so.user_id.email:
                 continue
-
-            email_to = so.user_id.email
-            try:
-                template.send_mail(
-                    mo.id,
-                    force_send=True,
-                    raise_exception=False,
-                    email_values={'email_to': email_to}
-                )
-                mo.email_reminder_sent = True
-            except Exception as e:
-                return
-
+            mos_by_email[so.user_id.email] |= mo
+
+        reminded = self.browse()
+        for email_to, email_mos in mos_by_email.items():
+            template.send_mail_batch(
+                email_mos.ids,
+                force_send=False,
+                raise_exception=False,
+                email_values={'email_to': email_to},
+            )
+            reminded |= email_mos
+
+        reminded.write({'email_reminder_sent': True})
+        return reminded
@@ -32,6 +32,35 @@ class ProductTemplate(models.Model):
         elif not self._origin or self.raisin_type_id:
             self.raisin_type_id = False
 
+    def _get_variants_for_combinations(self, combinations):
+        """Resolve several attribute combinations of the template in one query.
+
+        Variants are matched on ``combination_indices``, the signature (sorted
+        ids of the variant creating values) stored and indexed on every
+        variant; active variants win over archived ones.
+
+        :param list combinations: product.template.attribute.value recordsets
+        :return: list of product.product, empty when no variant matches
+        """
+        self.ensure_one()
+        signatures = [
+            combination._without_no_variant_attributes()._ids2str()
+            for combination in combinations
+        ]
+        wanted = list(set(signatures))
+        if '' in wanted:
+            wanted.append(False)
+        variants = self.env['product.product'].with_context(active_test=False).search_fetch(
+            [('product_tmpl_id', '=', self.id), ('combination_indices', 'in', wanted)],
+            ['combination_indices', 'active'],
+            order='active DESC, id',
+        )
+        by_signature = {}
+        for variant in variants:
+            by_signature.setdefault(variant.combination_indices or '', variant)
+        no_variant = self.env['product.product']
+        return [by_signature.get(signature, no_variant) for signature in signatures]
+
 class ProductCategory(models.Model):
     _inherit = "product.category"
     
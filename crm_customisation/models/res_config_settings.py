@@ -13,6 +13,15 @@ class ResConfigSettings(models.TransientModel):
         string="Reminder Days Before End Date",
         required=True
     )
+    pincode_api_refresh = fields.Boolean(
+        string="Refresh PIN Codes from Postal API",
+        help="Look up PIN codes missing from the local directory on api.postalpincode.in "
+             "and keep the answers in the directory."
+    )
+    pincode_cache_ttl_days = fields.Integer(
+        string="PIN Code Cache Validity (days)",
+        default=30,
+    )
     @api.constrains('reminder_days')
     def _check_reminder_days(self):
         for rec in self:
@@ -24,6 +33,10 @@ class ResConfigSettings(models.TransientModel):
         IrConfig = self.env['ir.config_parameter'].sudo()
         IrConfig.set_param('crm_customisation.enable_reminder', self.enable_reminder)
         IrConfig.set_param('crm_customisation.reminder_days', self.reminder_days)
+        # stored as an explicit string: setting False would delete the key,
+        # and a missing key means enabled
+        IrConfig.set_param('crm_customisation.pincode_api_refresh', str(bool(self.pincode_api_refresh)))
+        IrConfig.set_param('crm_customisation.pincode_cache_ttl_days', self.pincode_cache_ttl_days)
 
     @api.model
     def get_values(self):
@@ -32,5 +45,7 @@ class ResConfigSettings(models.TransientModel):
         res.update({
             'enable_reminder': IrConfig.get_param('crm_customisation.enable_reminder', False),
             'reminder_days': int(IrConfig.get_param('crm_customisation.reminder_days', 0)),
+            'pincode_api_refresh': IrConfig.get_param('crm_customisation.pincode_api_refresh', 'True') == 'True',
+            'pincode_cache_ttl_days': int(IrConfig.get_param('crm_customisation.pincode_cache_ttl_days', 30)),
         })
         return res
\ No newline at end of file
@@ -1,28 +1,10 @@
 # -*- coding: utf-8 -*-
-import requests
 import logging
 import re
-from functools import lru_cache
 from odoo import models, api, _
 
 _logger = logging.getLogger(__name__)
 
-# Global session (connection reuse = faster)
-_session = requests.Session()
-_session.headers.update({"User-Agent": "Mozilla/5.0"})
-
-@lru_cache(maxsize=5000)
-def _fetch_pin_info(zip_code):
-    """Fetch postal info with caching for speed."""
-    url = f'https://api.postalpincode.in/pincode/{zip_code}'
-    try:
-        r = _session.get(url, timeout=3)
-        r.raise_for_status()
-        return r.json()
-    except Exception as e:
-        _logger.error("PIN API failed for %s: %s", zip_code, e)
-        return None
-
 
 class ResPartner(models.Model):
     _inherit = 'res.partner'
@@ -50,11 +32,7 @@ class ResPartner(models.Model):
         self.city = False
         self.state_id = False
 
-        data = _fetch_pin_info(self.zip)
-        if not data or not (isinstance(data, list) and data and data[0].get('Status') == 'Success'):
-            return
-
-        post_offices = data[0].get('PostOffice') or []
+        post_offices = self.env['res.partner.pincode']._get_post_offices(self.zip)
         if not post_offices:
             return
 
@@ -71,35 +49,24 @@ class ResPartner(models.Model):
 
         # Case 1: Street is empty → fallback to district
         if not street_norm:
-            district = post_offices[0].get('District') or ''
-            if district:
-                self.city = district
-            # Apply state as well
-            state_name = post_offices[0].get('State')
-            if state_name and self.country_id:
-                state = self.env['res.country.state'].search([
-                    ('name', '=', state_name),
-                    ('country_id', '=', self.country_id.id)
-                ], limit=1)
-                if state:
-                    self.state_id = state.id
+            self._apply_district(post_offices[0])
             return
 
         # Case 2: Street provided → try matches
         for po in post_offices:
-            if norm(po.get('Name')) and norm(po.get('Name')) in street_norm:
+            if norm(po.office_name) and norm(po.office_name) in street_norm:
                 chosen = po
                 break
 
         if not chosen:
             for po in post_offices:
-                if norm(po.get('Block')) and norm(po.get('Block')) in street_norm:
+                if norm(po.block) and norm(po.block) in street_norm:
                     chosen = po
                     break
 
         if not chosen:
             for po in post_offices:
-                if norm(po.get('District')) and norm(po.get('District')) in street_norm:
+                if norm(po.district) and norm(po.district) in street_norm:
                     chosen = po
                     break
 
@@ -109,40 +76,30 @@ class ResPartner(models.Model):
                 chosen = post_offices[0]
             else:
                 # multiple options, no clear match → default to district
-                district = post_offices[0].get('District') or ''
-                self.city = district
-                state_name = post_offices[0].get('State')
-                if state_name and self.country_id:
-                    state = self.env['res.country.state'].search([
-                        ('name', '=', state_name),
-                        ('country_id', '=', self.country_id.id)
-                    ], limit=1)
-                    if state:
-                        self.state_id = state.id
-                _logger.warning("Multiple localities found for PIN=%s, no street match → using District=%s", self.zip, district)
+                self._apply_district(post_offices[0])
+                _logger.warning("Multiple localities found for PIN=%s, no street match → using District=%s", self.zip, post_offices[0].district)
                 return
 
         # Apply chosen locality
         if chosen:
             self._apply_postoffice(chosen)
 
+    def _apply_district(self, po):
+        """Helper to set the district as city, and the state, from a directory entry."""
+        if po.district:
+            self.city = po.district
+        self._apply_state(po)
 
     def _apply_postoffice(self, po):
-        """Helper to set fields from a single PostOffice dict."""
+        """Helper to set fields from a single directory entry."""
         if not po:
             return
 
-        district = po.get('District') or ''
-        state_name = po.get('State')
-        name = po.get('Name') or ''
-
         # City = PostOffice name (preferred), else District
-        self.city = name or district
-
-        if state_name and self.country_id:
-            state = self.env['res.country.state'].search([
-                ('name', '=', state_name),
-                ('country_id', '=', self.country_id.id)
-            ], limit=1)
-            if state:
-                self.state_id = state.id
+        self.city = po.office_name or po.district or ''
+        self._apply_state(po)
+
+    def _apply_state(self, po):
+        """State is precomputed on the directory entry, only check the country."""
+        if po.state_id and self.country_id and po.state_id.country_id == self.country_id:
+            self.state_id = po.state_id
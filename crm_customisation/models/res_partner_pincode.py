@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+import base64
+import csv
+import io
+import logging
+from datetime import timedelta
+
+import requests
+
+from odoo import api, fields, models
+from odoo.tools import SQL
+
+_logger = logging.getLogger(__name__)
+
+# Global session (connection reuse = faster)
+_session = requests.Session()
+_session.headers.update({"User-Agent": "Mozilla/5.0"})
+
+IMPORT_BATCH_SIZE = 5000
+
+# Column aliases of the "All India Pincode Directory" CSV (data.gov.in) and of
+# the JSON payload returned by api.postalpincode.in.
+CSV_COLUMN_MAP = {
+    'pincode': 'name',
+    'officename': 'office_name',
+    'name': 'office_name',
+    'taluk': 'block',
+    'block': 'block',
+    'districtname': 'district',
+    'district': 'district',
+    'statename': 'state_name',
+    'state': 'state_name',
+}
+
+
+def _fetch_pin_info(zip_code):
+    """Fetch postal info from api.postalpincode.in, None on failure."""
+    url = f'https://api.postalpincode.in/pincode/{zip_code}'
+    try:
+        r = _session.get(url, timeout=3)
+        r.raise_for_status()
+        return r.json()
+    except Exception as e:
+        _logger.error("PIN API failed for %s: %s", zip_code, e)
+        return None
+
+
+class ResPartnerPincode(models.Model):
+    _name = "res.partner.pincode"
+    _description = "PIN Code Directory"
+    _order = "name, office_name"
+
+    name = fields.Char(string="PIN Code", required=True, index=True)
+    office_name = fields.Char(string="Post Office")
+    block = fields.Char(string="Block / Taluk")
+    district = fields.Char(string="District")
+    state_name = fields.Char(string="State Name")
+    country_id = fields.Many2one(
+        'res.country',
+        string="Country",
+        default=lambda self: self.env.ref('base.in', raise_if_not_found=False),
+    )
+    state_id = fields.Many2one(
+        'res.country.state',
+        string="State",
+        compute='_compute_state_id',
+        store=True,
+        readonly=False,
+    )
+    source = fields.Selection(
+        [('import', "Imported"), ('api', "Postal API")],
+        string="Source",
+        default='import',
+        required=True,
+    )
+    fetch_date = fields.Datetime(string="Fetched On")
+
+    @api.depends('state_name', 'country_id')
+    def _compute_state_id(self):
+        """Resolve state names once per country instead of once per lookup."""
+        states_by_country = {}
+        for country in self.country_id:
+            states_by_country[country.id] = {
+                state.name.strip().lower(): state
+                for state in self.env['res.country.state'].search([('country_id', '=', country.id)])
+            }
+        for rec in self:
+            states = states_by_country.get(rec.country_id.id, {})
+            rec.state_id = states.get((rec.state_name or '').strip().lower(), False)
+
+    # ------------------------------
+    # Lookup
+    # ------------------------------
+    @api.model
+    def _is_api_refresh_enabled(self):
+        IrConfig = self.env['ir.config_parameter'].sudo()
+        return IrConfig.get_param('crm_customisation.pincode_api_refresh', 'True') == 'True'
+
+    @api.model
+    def _get_post_offices(self, zip_code):
+        """Return the directory entries for a PIN code.
+
+        Read only, as it runs from the partner onchange: a PIN code missing
+        from the directory is looked up on the postal API (when enabled) and
+        answered with unsaved entries. Storing and refreshing API answers is
+        left to the directory cron, see ``_cron_refresh_from_api``.
+        """
+        directory = self.sudo()
+        entries = directory.search([('name', '=', zip_code)])
+        if entries or not self._is_api_refresh_enabled():
+            return entries
+
+        return directory.browse().concat(*(
+            directory.new(vals) for vals in self._get_api_entry_values(zip_code)
+        ))
+
+    @api.model
+    def _get_api_entry_values(self, zip_code):
+        """Directory values of the post offices of a PIN code, from the
+        postal API; empty on failure."""
+        data = _fetch_pin_info(zip_code)
+        if not (isinstance(data, list) and data and data[0].get('Status') == 'Success'):
+            return []
+        now = fields.Datetime.now()
+        return [
+            dict(
+                self._prepare_entry_values(dict(po, Pincode=zip_code)),
+                source='api',
+                fetch_date=now,
+            )
+            for po in data[0].get('PostOffice') or []
+        ]
+
+    @api.model
+    def _cron_refresh_from_api(self, limit=200):
+        """Store the API answers of the partner PIN codes missing from the
+        directory and refresh the API entries older than the configured TTL,
+        at most ``limit`` PIN codes per run. Failures keep the entries as
+        they are and are retried on the next run."""
+        if not self._is_api_refresh_enabled():
+            return
+        directory = self.sudo()
+        IrConfig = self.env['ir.config_parameter'].sudo()
+        ttl_days = int(IrConfig.get_param('crm_customisation.pincode_cache_ttl_days', 30))
+        expiry = fields.Datetime.now() - timedelta(days=ttl_days)
+
+        self.env.flush_all()
+        self.env.cr.execute(SQL(
+            """
+            SELECT DISTINCT partner.zip
+              FROM res_partner partner
+             WHERE partner.zip ~ '^[0-9]{6}$'
+               AND NOT EXISTS (SELECT 1 FROM res_partner_pincode entry WHERE entry.name = partner.zip)
+             LIMIT %s
+            """,
+            limit,
+        ))
+        pincodes = [zip_code for zip_code, in self.env.cr.fetchall()]
+        if len(pincodes) < limit:
+            stale = directory.search([
+                ('source', '=', 'api'),
+                '|', ('fetch_date', '=', False), ('fetch_date', '<', expiry),
+            ])
+            pincodes += list(dict.fromkeys(stale.mapped('name')))[:limit - len(pincodes)]
+
+        refreshed = 0
+        for zip_code in pincodes:
+            vals_list = self._get_api_entry_values(zip_code)
+            if not vals_list:
+                continue
+            directory.search([('name', '=', zip_code), ('source', '=', 'api')]).unlink()
+            directory.create(vals_list)
+            refreshed += 1
+        _logger.info("Refreshed %s of %s PIN codes from the postal API", refreshed, len(pincodes))
+
+    # ------------------------------
+    # Import
+    # ------------------------------
+    @api.model
+    def _prepare_entry_values(self, row):
+        vals = {}
+        for column, value in row.items():
+            field_name = CSV_COLUMN_MAP.get((column or '').strip().lower())
+            if field_name and value and field_name not in vals:
+                vals[field_name] = str(value).strip()
+        return vals
+
+    @api.model
+    def load_csv(self, csv_content):
+        """Load a PIN code directory CSV, replacing previously imported entries
+        of the PIN codes it contains. Returns the number of entries loaded."""
+        if isinstance(csv_content, bytes):
+            csv_content = csv_content.decode('utf-8-sig')
+
+        vals_list = []
+        for row in csv.DictReader(io.StringIO(csv_content)):
+            vals = self._prepare_entry_values(row)
+            if vals.get('name'):
+                vals_list.append(vals)
+        if not vals_list:
+            return 0
+
+        directory = self.sudo()
+        pincodes = list({vals['name'] for vals in vals_list})
+        directory.search([('name', 'in', pincodes), ('source', '=', 'import')]).unlink()
+        for start in range(0, len(vals_list), IMPORT_BATCH_SIZE):
+            directory.create(vals_list[start:start + IMPORT_BATCH_SIZE])
+        _logger.info("Loaded %s PIN code entries (%s PIN codes)", len(vals_list), len(pincodes))
+        return len(vals_list)
+
+
+class ResPartnerPincodeImport(models.TransientModel):
+    _name = "res.partner.pincode.import"
+    _description = "Import PIN Code Directory"
+
+    csv_file = fields.Binary(string="Directory (CSV)", required=True)
+    csv_filename = fields.Char(string="Filename")
+
+    def action_import(self):
+        self.ensure_one()
+        count = self.env['res.partner.pincode'].load_csv(base64.b64decode(self.csv_file))
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'type': 'success',
+                'message': f'{count} PIN code entries imported.',
+                'next': {'type': 'ir.actions.act_window_close'},
+            },
+        }
@@ -1,8 +1,8 @@
 # -*- coding: utf-8 -*-
-from odoo import api, fields, models ,_
-from odoo.exceptions import UserError
-import json
+from collections import defaultdict
+from odoo import api, fields, models
 import logging
+
 _logger = logging.getLogger(__name__)
 
 
@@ -47,123 +47,50 @@ class SaleOrder(models.Model):
                     order.opportunity_id = crm_lead_id
                     _logger.info(f"✅ Linked Sale Order {order.id} to Opportunity {crm_lead_id}")
         
-        # ✅ FIX 5: Create spreadsheet with proper error handling
-        if crm_has_spreadsheet and crm_lead_id:
-            crm_lead = self.env['crm.lead'].browse(crm_lead_id)
-            
-            if not crm_lead.exists():
-                _logger.warning(f"⚠️ CRM Lead {crm_lead_id} not found")
-                return orders
-            
-            for order in orders:
-                try:
-                    # ✅ FIX 6: Removed time.sleep - use commit instead
-                    self.env.cr.commit()
-                    
-                    # Refresh order to get latest data
-                    fresh_order = self.env['sale.order'].browse(order.id)
-                    
-                    # Create spreadsheet
-                    spreadsheet = crm_lead._create_sales_spreadsheet_with_data(fresh_order)
-                    
-                    if spreadsheet:
-                        _logger.info(f"✅ Spreadsheet {spreadsheet.id} created for order {fresh_order.id}")
-                    else:
-                        _logger.warning(f"⚠️ Spreadsheet creation returned False for order {fresh_order.id}")
-                        
-                except Exception as e:
-                    # ✅ FIX 7: Don't fail order creation if spreadsheet fails
-                    _logger.error(f"❌ Spreadsheet creation error for order {order.id}: {e}", exc_info=True)
-                    # Continue with next order
-                    continue
-        
         return orders
-    
-    def action_open_spreadsheet_common(self):
-        """
-        Open or create Sale Order spreadsheet
-        """
-        self.ensure_one()
-        
-        _logger.info(f"\n🔵 [OPEN SPREADSHEET] Sale Order: {self.id}, Name: {self.name}")
-        
-        # ✅ FIX 8: Always search for existing spreadsheet first
-        spreadsheet = self.env['sale.order.spreadsheet'].search([
-            ('order_id', '=', self.id)
-        ], limit=1)
-        
-        if spreadsheet and spreadsheet.exists():
-            _logger.info(f"✅ Found existing spreadsheet {spreadsheet.id}")
-            return spreadsheet.action_open_spreadsheet()
-        
-        # ✅ FIX 9: Check if we have an opportunity with spreadsheet
-        if self.opportunity_id:
-            _logger.info(f"🔄 Checking opportunity {self.opportunity_id.id} for spreadsheet")
-            
-            crm_spreadsheet = self.env['crm.lead.spreadsheet'].search([
-                ('lead_id', '=', self.opportunity_id.id),
-                ('raw_spreadsheet_data', '!=', False)
-            ], limit=1)
-            
-            if crm_spreadsheet and crm_spreadsheet.exists():
-                _logger.info(f"🔄 Found CRM spreadsheet {crm_spreadsheet.id}, converting...")
-                
-                try:
-                    # Convert CRM data to Sales format
-                    sales_data_json = self.opportunity_id._convert_crm_spreadsheet_to_sales(
-                        crm_spreadsheet, self
-                    )
-                    
-                    if sales_data_json:
-                        # Create new spreadsheet with converted data
-                        spreadsheet = self.env['sale.order.spreadsheet'].create({
-                            'name': f"{self.name} - Calculator",
-                            'order_id': self.id,
-                            'raw_spreadsheet_data': sales_data_json,
-                        })
-                        
-                        _logger.info(f"✅ Created spreadsheet {spreadsheet.id} from CRM data")
-                        return spreadsheet.action_open_spreadsheet()
-                    else:
-                        _logger.warning("⚠️ Conversion returned empty data")
-                        
-                except Exception as e:
-                    _logger.error(f"❌ Error converting CRM spreadsheet: {e}", exc_info=True)
-                    # Continue to create empty spreadsheet
-        
-        # ✅ FIX 10: Create empty spreadsheet as fallback
-        _logger.info("📝 Creating new empty spreadsheet")
-        
-        try:
-            spreadsheet = self.env['sale.order.spreadsheet'].create({
-                'name': f"{self.name} - Calculator",
-                'order_id': self.id,
-            })
-            
-            _logger.info(f"✅ Created empty spreadsheet {spreadsheet.id}")
-            return spreadsheet.action_open_spreadsheet()
-            
-        except Exception as e:
-            _logger.error(f"❌ Failed to create spreadsheet: {e}", exc_info=True)
-            raise UserError(_("Failed to create calculator: %s") % str(e))
-
 
-    
     def action_confirm(self):
         result = super().action_confirm()
-        for line in self.order_line:
-            mos = self.env['mrp.production'].search([
-                ('origin', '=', self.name),
-                ('product_id', '=', line.product_id.id),
-                ('state', '=', 'draft')
-            ])
-            for mo in mos:
-                mo.write({
-                    'raisin_type_id': line.raisin_type_id.id if line.raisin_type_id else False,
-                    'ask_for_delivery_date': self.ask_for_delivery_date,
-                    'delivery_date': self.delivery_date,
-                })
+        self._propagate_line_values_to_mos()
         return result
+
+    def _propagate_line_values_to_mos(self):
+        """Apply raisin type and delivery fields to the draft MOs of the orders.
+
+        They normally arrive through the procurement values (see
+        StockRule._prepare_mo_values); this only catches up MOs whose
+        procurement did not carry them, with one search and one write per
+        distinct set of values.
+        """
+        mos = self.env['mrp.production'].search([
+            ('sale_order_id', 'in', self.ids),
+            ('state', '=', 'draft'),
+        ])
+        if not mos:
+            return
+
+        vals_by_key = {}
+        for order in self:
+            for line in order.order_line:
+                vals_by_key[order.id, line.product_id.id] = {
+                    'raisin_type_id': line.raisin_type_id.id,
+                    'ask_for_delivery_date': order.ask_for_delivery_date,
+                    'delivery_date': order.delivery_date,
+                }
+
+        mos_by_vals = defaultdict(lambda: self.env['mrp.production'])
+        for mo in mos:
+            vals = vals_by_key.get((mo.sale_order_id.id, mo.product_id.id))
+            if not vals or (
+                mo.raisin_type_id.id == vals['raisin_type_id']
+                and mo.ask_for_delivery_date == vals['ask_for_delivery_date']
+                and mo.delivery_date == vals['delivery_date']
+            ):
+                continue
+            mos_by_vals[tuple(vals.items())] |= mo
+
+        for vals, vals_mos in mos_by_vals.items():
+            vals_mos.write(dict(vals))
     
 
 
@@ -198,6 +125,7 @@ class SaleOrderLine(models.Model):
                 'ask_for_delivery_date': sale_order.ask_for_delivery_date,
                 'delivery_date': sale_order.delivery_date,
                 'raisin_type_id': self.raisin_type_id.id if self.raisin_type_id else False,
+                'sale_order_id': sale_order.id,
             })
         return values
 
@@ -217,6 +145,15 @@ class StockRule(models.Model):
         res = super()._prepare_mo_values(product_id, product_qty, product_uom, location_src_id, name, origin, values)
         if values.get('raisin_type_id'):
             res['raisin_type_id'] = values['raisin_type_id']
+        if 'ask_for_delivery_date' in values:
+            res['ask_for_delivery_date'] = values['ask_for_delivery_date']
+            res['delivery_date'] = values.get('delivery_date')
+        # Multi-step routes lose custom procurement values, fall back on the group
+        sale_order_id = values.get('sale_order_id')
+        if not sale_order_id and values.get('group_id') and 'sale_id' in values['group_id']._fields:
+            sale_order_id = values['group_id'].sale_id.id
+        if sale_order_id:
+            res['sale_order_id'] = sale_order_id
         return res
 
 class SupplierInfo(models.Model):
@@ -14,6 +14,8 @@
     'depends': ['base', 'web','crm_customisation','product_matrix'],
     'data': [
         'security/ir.model.access.csv',
+        'data/ir_cron_data.xml',
+        'report/crm_material_line_report_views.xml',
         # 'views/crm_lead_view.xml',
         'views/optional_product_template.xml',
         'views/product_template_views.xml',
@@ -56,39 +56,91 @@ class ProductConfiguratorController(Controller):
                     parent_product_tmpl_ids=[],
                 )
             ],
-            optional_products=[
-                dict(
-                    **self._get_product_information(
-                        optional_product_template,
-                        optional_product_template._get_first_possible_combination(
-                            parent_combination=combination
-                        ),
-                        currency_id,
-                        # giving all the ptav of the parent product to get all the exclusions
-                        parent_combination=product_template.attribute_line_ids.product_template_value_ids,
-                    ),
-                    parent_product_tmpl_ids=[product_template.id],
-                )
-                for optional_product_template in product_template.optional_product_ids
-            ]
+            optional_products=self._get_optional_products_information(
+                product_template,
+                combination,
+                currency_id,
+                # giving all the ptav of the parent product to get all the exclusions
+                exclusions_parent_combination=product_template.attribute_line_ids.product_template_value_ids,
+            )
             if not only_main_product
             else [],
         )
 
+    @route('/crm_product_configurator/bootstrap', type='json', auth='user')
+    def get_product_configurator_bootstrap(
+        self,
+        product_template_id,
+        quantity,
+        currency_id=None,
+        product_uom_id=None,
+        company_id=None,
+        ptav_ids=None,
+        only_main_product=False,
+        check_single_variant=False,
+    ):
+        """ Return everything needed to open the configurator in one call: the
+        template mode, its single variant when ``check_single_variant`` is set
+        (in which case no dialog is needed) and the configurator values.
+        """
+        if company_id:
+            request.update_context(allowed_company_ids=[company_id])
+
+        product_template = request.env['product.template'].browse(product_template_id)
+        result = dict(product_config_mode=product_template.product_config_mode or 'configurator')
+        if check_single_variant:
+            result['single_variant'] = product_template.get_single_product_variant()
+            if result['single_variant'].get('product_id'):
+                return result
+
+        result.update(self.get_product_configurator_values(
+            product_template_id,
+            quantity,
+            currency_id=currency_id,
+            product_uom_id=product_uom_id,
+            company_id=company_id,
+            ptav_ids=ptav_ids,
+            only_main_product=only_main_product,
+        ))
+        return result
+
     @route('/crm_product_configurator/create_product', type='json', auth='user')
     def purchase_product_configurator_create_product(self, product_template_id, combination):
         """ Create the product when there is a dynamic attribute in the combination.
         """
         product_template = request.env['product.template'].browse(product_template_id)
         combination = request.env['product.template.attribute.value'].browse(combination)
-        product = product_template._create_product_variant(combination)
-        return product.id
+        return product_template._materialize_variants([combination])[0]
+
+    @route('/crm_product_configurator/create_products', type='json', auth='user')
+    def purchase_product_configurator_create_products(self, products):
+        """ Return the variant id of each ``{product_template_id, combination}``
+        of ``products``, creating the dynamic variants that do not exist yet.
+        """
+        indexes_by_template = {}
+        for index, product in enumerate(products):
+            indexes_by_template.setdefault(product['product_template_id'], []).append(index)
+
+        result = [False] * len(products)
+        PTAV = request.env['product.template.attribute.value']
+        for template_id, indexes in indexes_by_template.items():
+            variant_ids = request.env['product.template'].browse(template_id)._materialize_variants(
+                [PTAV.browse(products[index]['combination']) for index in indexes]
+            )
+            for index, variant_id in zip(indexes, variant_ids):
+                result[index] = variant_id
+        return result
 
     @route('/crm_product_configurator/update_combination', type='json', auth='user')
     def purchase_product_configurator_update_combination(self, **kwargs):
-        """ Return the updated combination information. """
+        """ Return the updated combination information.
+
+        ``combinations`` (a list of ptav id lists) may be given instead of
+        ``combination`` to evaluate several candidates at once; the result is
+        then a list, in the same order.
+        """
         product_template_id = kwargs.get('product_template_id')
-        combination = kwargs.get('combination')
+        combinations = kwargs.get('combinations')
         quantity = kwargs.get('quantity')
         currency_id = kwargs.get('currency_id')
         product_uom_id = kwargs.get('product_uom_id')
@@ -100,16 +152,27 @@ class ProductConfiguratorController(Controller):
         product_template = request.env['product.template'].browse(product_template_id)
         product_uom = request.env['uom.uom'].browse(product_uom_id)
         currency = request.env['res.currency'].browse(currency_id)
-        combination = request.env['product.template.attribute.value'].browse(combination)
-        product = product_template._get_variant_for_combination(combination)
-
-        return self._get_basic_product_information(
-            product or product_template,
-            combination,
-            quantity=quantity or 0.0,
-            uom=product_uom,
-            currency=currency,
-        )
+        PTAV = request.env['product.template.attribute.value']
+        is_batch = combinations is not None
+        if not is_batch:
+            combinations = [kwargs.get('combination')]
+        combinations = [PTAV.browse(combination) for combination in combinations]
+        # one variant lookup for all the candidates; like
+        # _get_variant_for_combination, an archived variant is used when no
+        # active one matches
+        variants = product_template._get_variants_for_combinations(combinations)
+
+        results = [
+            self._get_basic_product_information(
+                product or product_template,
+                combination,
+                quantity=quantity or 0.0,
+                uom=product_uom,
+                currency=currency,
+            )
+            for combination, product in zip(combinations, variants)
+        ]
+        return results if is_batch else results[0]
 
     @route('/crm_product_configurator/get_optional_products', type='json', auth='user')
     def purchase_product_configurator_get_optional_products(
@@ -130,20 +193,11 @@ class ProductConfiguratorController(Controller):
             parent_combination + combination
         )
 
-        return [
-            dict(
-                **self._get_product_information(
-                    optional_product_template,
-                    optional_product_template._get_first_possible_combination(
-                        parent_combination=parent_combination
-                    ),
-                    currency_id,
-                    parent_combination=parent_combination,
-                ),
-                parent_product_tmpl_ids=[product_template.id],
-            )
-            for optional_product_template in product_template.optional_product_ids
-        ]
+        return self._get_optional_products_information(
+            product_template,
+            parent_combination,
+            currency_id,
+        )
 
     @http.route('/crm_product_configurator/save_to_crm', type='json', auth='user', methods=['POST'])
     def save_to_crm(self, **kwargs):
@@ -405,18 +459,14 @@ class ProductConfiguratorController(Controller):
                 # EXISTING LINE CHECK
                 # =========================
                 def _get_existing_line(lead, template, ptav_ids):
-                    lines = request.env['crm.material.line'].sudo().search([
+                    # lines whose variant has exactly these values, matched on
+                    # the indexed variant signature
+                    signature = request.env['product.template.attribute.value'].browse(ptav_ids)._ids2str()
+                    return request.env['crm.material.line'].sudo().search([
                         ('lead_id', '=', lead.id),
                         ('product_template_id', '=', template.id),
+                        ('product_id.combination_indices', '=', signature),
                     ], limit=1)
-                    for line in lines:
-                        if line.product_id:
-                            existing_ptav_ids = set(
-                                line.product_id.product_template_attribute_value_ids.ids
-                            )
-                            if set(ptav_ids) == existing_ptav_ids:
-                                return line
-                    return False
 
                 # If file_upload present, always create new line
                 if has_file_upload_ptav:
@@ -550,72 +600,153 @@ class ProductConfiguratorController(Controller):
         product_uom_id=None,
         parent_combination=None,
     ):
+        return self._get_products_information(
+            [(product_template, combination)],
+            currency_id,
+            quantity=quantity,
+            product_uom_id=product_uom_id,
+            parent_combination=parent_combination,
+        )[0]
+
+    def _get_optional_products_information(
+        self,
+        product_template,
+        parent_combination,
+        currency_id,
+        exclusions_parent_combination=None,
+    ):
+        """ Return the configurator payload of every optional product of
+        `product_template`, resolved together.
+
+        Their first possible combination is computed against `parent_combination`,
+        their exclusions against `exclusions_parent_combination` (defaults to
+        `parent_combination`).
+        """
+        optional_templates = product_template.optional_product_ids
+        return [
+            dict(**information, parent_product_tmpl_ids=[product_template.id])
+            for information in self._get_products_information(
+                [
+                    (
+                        optional_template,
+                        optional_template._get_first_possible_combination(
+                            parent_combination=parent_combination
+                        ),
+                    )
+                    for optional_template in optional_templates
+                ],
+                currency_id,
+                parent_combination=exclusions_parent_combination or parent_combination,
+            )
+        ]
+
+    def _get_products_information(
+        self,
+        templates_combinations,
+        currency_id,
+        quantity=1,
+        product_uom_id=None,
+        parent_combination=None,
+    ):
+        """ Return the configurator payload of each `(product.template, combination)`
+        of `templates_combinations`.
+
+        Attributes, attribute values and m2o choices are read once for all the
+        templates, variants are resolved with one lookup per template and the
+        parent combination is shared by the exclusion computations.
+        """
         product_uom = request.env['uom.uom'].browse(product_uom_id)
         currency = request.env['res.currency'].browse(currency_id)
-        product = product_template._get_variant_for_combination(combination)
+        parent_ptav_ids = parent_combination.ids if parent_combination else []
 
-        attribute_exclusions = product_template._get_attribute_exclusions(
-            parent_combination=parent_combination,
-            combination_ids=combination.ids,
+        templates = request.env['product.template'].union(
+            *(template for template, _combination in templates_combinations)
         )
+        ptals = templates.attribute_line_ids
+        attributes = {
+            attribute['id']: attribute
+            for attribute in ptals.attribute_id.read(
+                ['id', 'name', 'display_type', 'm2o_model_id',
+                 'is_quantity', 'pair_with_previous', 'is_width_check']
+            )
+        }
+        ptavs = {
+            ptav['id']: ptav
+            for ptav in ptals.product_template_value_ids.read(
+                ['name', 'html_color', 'image', 'is_custom', 'm2o_res_id']
+            )
+        }
+        m2o_values = {}
+        for attribute in ptals.attribute_id:
+            model = attribute.m2o_model_id.model
+            if attribute.display_type != "m2o" or not model or model in m2o_values:
+                continue
+            m2o_values[model] = [
+                # records with a width (profiles) carry it for the width autofill
+                dict(id=rec.id, name=rec.display_name, **(
+                    {'width': rec.width} if 'width' in rec._fields else {}
+                ))
+                for rec in request.env[model].sudo().search([], order="name asc")
+            ]
 
-        return dict(
-            product_tmpl_id=product_template.id,
-            **self._get_basic_product_information(
-                product or product_template,
-                combination,
+        combinations_by_template = {}
+        for template, combination in templates_combinations:
+            combinations_by_template.setdefault(template, []).append(combination)
+        variants = {}
+        for template, combinations in combinations_by_template.items():
+            for combination, variant in zip(
+                combinations, template._get_variants_for_combinations(combinations)
+            ):
+                # archived variants are kept, as in _get_variant_for_combination
+                variants[template.id, tuple(combination.ids)] = variant
+
+        result = []
+        for product_template, combination in templates_combinations:
+            product = variants[product_template.id, tuple(combination.ids)]
+            attribute_exclusions = product_template._get_combination_exclusions(
+                parent_ptav_ids,
+                combination_ids=combination.ids,
+            )
+            result.append(dict(
+                product_tmpl_id=product_template.id,
+                **self._get_basic_product_information(
+                    product or product_template,
+                    combination,
+                    quantity=quantity,
+                    uom=product_uom,
+                    currency=currency,
+                ),
                 quantity=quantity,
-                uom=product_uom,
-                currency=currency,
-            ),
-            quantity=quantity,
-            attribute_lines=[
-                dict(
-                    id=ptal.id,
-                    # ATTRIBUTE meta (with m2o model info)
-                    attribute=dict(
-                        **ptal.attribute_id.read(
-                            ['id', 'name', 'display_type', 'm2o_model_id']
-                        )[0],
-                        m2o_values=(
-                            [
-                                dict(id=rec.id, name=rec.display_name)
-                                for rec in request.env[
-                                    ptal.attribute_id.m2o_model_id.model
-                                ]
-                                .sudo()
-                                .search([], order="name asc")
-                            ]
-                            if (
-                                ptal.attribute_id.display_type == "m2o"
-                                and ptal.attribute_id.m2o_model_id
-                                and ptal.attribute_id.m2o_model_id.model
-                            )
-                            else []
+                attribute_lines=[
+                    dict(
+                        id=ptal.id,
+                        # ATTRIBUTE meta (with m2o model info)
+                        attribute=dict(
+                            **attributes[ptal.attribute_id.id],
+                            m2o_model_technical_name=ptal.attribute_id.m2o_model_id.model or False,
+                            m2o_values=m2o_values.get(
+                                ptal.attribute_id.m2o_model_id.model, []
+                            ) if ptal.attribute_id.display_type == "m2o" else [],
                         ),
-                    ),
-                    # PTAV list (expose m2o_res_id to FE as well)
-                    attribute_values=[
-                        dict(
-                            **ptav.read(
-                                ['name', 'html_color', 'image', 'is_custom', 'm2o_res_id']
-                            )[0]
-                        )
-                        for ptav in ptal.product_template_value_ids
-                        if ptav.ptav_active
-                        or (combination and ptav.id in combination.ids)
-                    ],
-                    selected_attribute_value_ids=combination.filtered(
-                        lambda c: ptal in c.attribute_line_id
-                    ).ids,
-                    create_variant=ptal.attribute_id.create_variant,
-                )
-                for ptal in product_template.attribute_line_ids
-            ],
-            exclusions=attribute_exclusions['exclusions'],
-            archived_combinations=attribute_exclusions['archived_combinations'],
-            parent_exclusions=attribute_exclusions['parent_exclusions'],
-        )
+                        # PTAV list (expose m2o_res_id to FE as well)
+                        attribute_values=[
+                            dict(**ptavs[ptav.id])
+                            for ptav in ptal.product_template_value_ids
+                            if ptav.ptav_active
+                            or (combination and ptav.id in combination.ids)
+                        ],
+                        selected_attribute_value_ids=combination.filtered(
+                            lambda c: ptal in c.attribute_line_id
+                        ).ids,
+                        create_variant=ptal.attribute_id.create_variant,
+                    )
+                    for ptal in product_template.attribute_line_ids
+                ],
+                exclusions=attribute_exclusions['exclusions'],
+                archived_combinations=attribute_exclusions['archived_combinations'],
+                parent_exclusions=attribute_exclusions['parent_exclusions'],
+            ))
+        return result
 
     def _get_basic_product_information(self, product_or_template, combination, **kwargs):
         """ Return basic information about a product
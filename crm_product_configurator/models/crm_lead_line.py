@@ -1,7 +1,12 @@
 # -*- coding: utf-8 -*-
-from odoo import api, fields, models
+import json
 import logging
 
+from odoo import api, fields, models, _
+from odoo.exceptions import UserError
+from odoo.tools import SQL
+from odoo.tools.sql import create_index
+
 _logger = logging.getLogger(__name__)
 
 
@@ -29,7 +34,6 @@ class CrmMaterialLine(models.Model):
     attributes_description = fields.Text(
         string=" Description",
         compute="_compute_attributes_description",
-        store=True
     )
 
     attributes_json = fields.Json(
@@ -37,56 +41,86 @@ class CrmMaterialLine(models.Model):
         compute="_compute_attributes_json",
         store=True
     )
-    
-    
-    @api.depends(
-        'product_template_attribute_value_ids',
-        'product_custom_attribute_value_ids',
-        'attached_file_name'
-    )
-    def _compute_attributes_description(self):
-        """Attributes description WITHOUT file upload"""
-        for record in self:
-            template_attrs = []
 
-            for ptav in record.product_template_attribute_value_ids:
-                attr = ptav.attribute_id
-                if not attr:
-                    continue
+    # Search-only field: ('attribute_filter', '>=', ('Thickness', 5))
+    attribute_filter = fields.Char(
+        string="Attribute Filter",
+        compute="_compute_attribute_filter",
+        search="_search_attribute_filter",
+    )
 
-                display_type = attr.display_type
-                key = attr.name
+    def init(self):
+        super().init()
+        create_index(
+            self.env.cr,
+            'crm_material_line__attributes_json_gin_index',
+            self._table,
+            ['attributes_json'],
+            method='gin',
+        )
+    
+    
+    def _compute_attribute_filter(self):
+        self.attribute_filter = False
 
-                # 🔥 SKIP file_upload completely
-                if display_type == "file_upload":
-                    continue
+    def _search_attribute_filter(self, operator, value):
+        """Filter lines on a key of attributes_json in the database.
 
-                # 🔥 SKIP is_quantity attributes
-                if attr.is_quantity:
-                    continue
+        ``value`` is an ``(attribute, operand)`` pair, e.g.
+        ``('attribute_filter', '=', ('Profile', 'I-Beam'))`` or
+        ``('attribute_filter', '>=', ('Thickness', 5))``. Equality and
+        membership use jsonb containment and the GIN index; ordering
+        operators compare the value numerically, non-numeric values never match.
+        """
+        if not isinstance(value, (list, tuple)) or len(value) != 2:
+            raise UserError(_("Attribute filters expect an (attribute, value) pair, got %s.", value))
+        key, operand = value
+        column = SQL.identifier(self._table, 'attributes_json')
 
-                # M2O
-                if display_type == "m2o" and ptav.m2o_res_id:
-                    model = attr.m2o_model_id.model
-                    rec = self.env[model].sudo().browse(ptav.m2o_res_id)
-                    value = rec.display_name
-                else:
-                    value = ptav.name
+        if operator in ('=', '!='):
+            condition = SQL("%s @> %s::jsonb", column, json.dumps({key: operand}))
+        elif operator in ('in', 'not in'):
+            operands = operand if isinstance(operand, (list, tuple)) else [operand]
+            if not operands:
+                condition = SQL("FALSE")
+            else:
+                condition = SQL("(%s)", SQL(" OR ").join(
+                    SQL("%s @> %s::jsonb", column, json.dumps({key: item}))
+                    for item in operands
+                ))
+        elif operator in ('<', '<=', '>', '>='):
+            try:
+                number = float(operand)
+            except (TypeError, ValueError):
+                raise UserError(_("Attribute %(key)s can only be compared with a number, got %(value)s.", key=key, value=operand))
+            condition = SQL(
+                r"%(column)s ? %(key)s AND (CASE WHEN %(column)s ->> %(key)s ~ '^\s*-?[0-9]+(\.[0-9]+)?\s*$' "
+                "THEN (%(column)s ->> %(key)s)::numeric END) " + operator + " %(number)s",
+                column=column, key=key, number=number,
+            )
+        elif operator in ('ilike', 'not ilike'):
+            condition = SQL("%s ->> %s ILIKE %s", column, key, f"%{operand}%")
+        else:
+            raise UserError(_("Operator %s is not supported on attributes.", operator))
 
-                if value:
-                    template_attrs.append(f"{key}: {value}")
+        if operator in ('!=', 'not in', 'not ilike'):
+            condition = SQL("NOT COALESCE(%s, FALSE)", condition)
 
-            # Custom Attributes
-            custom_attrs = []
-            for custom in record.product_custom_attribute_value_ids:
-                ptav = custom.custom_product_template_attribute_value_id
-                if ptav and ptav.attribute_id:
-                    custom_attrs.append(f"{ptav.attribute_id.name}: {custom.custom_value}")
+        query = self._search([])
+        query.add_where(condition)
+        return [('id', 'in', query)]
 
-            # Final result (NO FILE)
-            record.attributes_description = ", ".join(template_attrs + custom_attrs) if (template_attrs or custom_attrs) else ""
+    @api.depends('attributes_json')
+    def _compute_attributes_description(self):
+        """Attributes description rendered from attributes_json on read, so
+        dynamic attribute writes only have to touch the JSON map"""
+        for record in self:
+            record.attributes_description = ", ".join(
+                f"{key.split('__')[0]}: {value}"
+                for key, value in (record.attributes_json or {}).items()
+                if value not in (None, False, "")
+            )
 
-            
     @api.depends(
         'attached_file_id',
         'attached_file_name',
@@ -1,4 +1,16 @@
+import logging
+
+from psycopg2 import errors
+
 from odoo import api, fields, models
+from odoo.tools import SQL, ormcache
+
+_logger = logging.getLogger(__name__)
+
+
+def _mask_to_ids(ptav_ids, mask):
+    """Attribute value ids of the bits set in ``mask``"""
+    return [ptav_id for index, ptav_id in enumerate(ptav_ids) if mask >> index & 1]
 
 
 class ProductTemplate(models.Model):
@@ -57,3 +69,281 @@ class ProductTemplate(models.Model):
                 'has_optional_products': has_optional_products,
             })
         return res
+
+    # ------------------------------------------------------------------
+    # Compiled attribute exclusions
+    # ------------------------------------------------------------------
+    def _get_exclusion_version(self):
+        """Key of the compiled exclusions: the last change (and row count, for
+        deletions) of the template, its lines and values, the exclusion rules
+        targeting it and its variants, read in a single query."""
+        self.ensure_one()
+        for model in ('product.template', 'product.template.attribute.line',
+                      'product.template.attribute.value', 'product.template.attribute.exclusion',
+                      'product.product'):
+            self.env[model].flush_model()
+        self.env.cr.execute(SQL(
+            """
+            SELECT tmpl.write_date,
+                   (SELECT ROW(max(write_date), count(*))::text FROM product_template_attribute_line WHERE product_tmpl_id = tmpl.id),
+                   (SELECT ROW(max(write_date), count(*))::text FROM product_template_attribute_value WHERE product_tmpl_id = tmpl.id),
+                   (SELECT ROW(max(write_date), count(*))::text FROM product_template_attribute_exclusion WHERE product_tmpl_id = tmpl.id),
+                   (SELECT ROW(max(write_date), count(*))::text FROM product_product WHERE product_tmpl_id = tmpl.id)
+              FROM product_template tmpl
+             WHERE tmpl.id = %s
+            """,
+            self.id,
+        ))
+        return tuple(str(value) for value in self.env.cr.fetchone() or ())
+
+    def _get_compiled_exclusions(self):
+        self.ensure_one()
+        return self._compile_attribute_exclusions(self._get_exclusion_version())
+
+    @ormcache('self.id', 'version')
+    def _compile_attribute_exclusions(self, version):
+        """Exclusion graph of the template as bitsets over its attribute values.
+
+        Returns a dict (shared through the cache, never mutate it) with:
+
+        * ``ptav_ids``: value ids of the valid attribute lines, bit ``i`` of
+          every mask standing for ``ptav_ids[i]``
+        * ``lines``: per valid line, the bits of its active values
+        * ``active_mask`` / ``variant_mask``: active values, values of variant
+          creating attributes
+        * ``excluded`` / ``excluded_by``: per bit, the values it excludes and
+          the values excluding it
+        * ``parent``: {value id of another template: mask it excludes here}
+        * ``active_variants``: variant masks of the active variants
+        * ``archived``: ((mask, ptav ids), ...) of archived-only combinations
+        """
+        self.ensure_one()
+        lines = self.valid_product_template_attribute_line_ids
+        ptavs = lines.product_template_value_ids
+        ptav_ids = tuple(ptavs.ids)
+        bits = {ptav_id: index for index, ptav_id in enumerate(ptav_ids)}
+        all_mask = (1 << len(ptav_ids)) - 1
+
+        def to_mask(ids):
+            mask = 0
+            for ptav_id in ids:
+                if ptav_id in bits:
+                    mask |= 1 << bits[ptav_id]
+            return mask
+
+        excluded = [0] * len(ptav_ids)
+        excluded_by = [0] * len(ptav_ids)
+        parent = {}
+        exclusions = self.env['product.template.attribute.exclusion'].search([('product_tmpl_id', '=', self.id)])
+        for exclusion in exclusions:
+            source_id = exclusion.product_template_attribute_value_id.id
+            if source_id in bits:
+                source = bits[source_id]
+                targets = to_mask(exclusion.value_ids.ids)
+                excluded[source] |= targets
+                for index in range(len(ptav_ids)):
+                    if targets >> index & 1:
+                        excluded_by[index] |= 1 << source
+            elif source_id:
+                targets = to_mask(exclusion.value_ids.ids) if exclusion.value_ids else all_mask
+                parent[source_id] = parent.get(source_id, 0) | targets
+
+        self.env.cr.execute(SQL(
+            """
+            SELECT product.active, array_remove(array_agg(comb.product_template_attribute_value_id), NULL)
+              FROM product_product product
+         LEFT JOIN product_variant_combination comb ON comb.product_product_id = product.id
+             WHERE product.product_tmpl_id = %s
+          GROUP BY product.id
+            """,
+            self.id,
+        ))
+        active_variants = set()
+        archived = {}
+        for active, combination_ids in self.env.cr.fetchall():
+            mask = to_mask(combination_ids)
+            if active:
+                active_variants.add(mask)
+            elif combination_ids:
+                archived[mask] = tuple(sorted(combination_ids))
+
+        return {
+            'ptav_ids': ptav_ids,
+            'lines': tuple(
+                tuple(bits[ptav.id] for ptav in line.product_template_value_ids._only_active())
+                for line in lines
+            ),
+            'active_mask': to_mask(ptavs._only_active().ids),
+            'variant_mask': to_mask(ptavs.filtered(
+                lambda ptav: ptav.attribute_id.create_variant != 'no_variant'
+            ).ids),
+            'has_dynamic': self.has_dynamic_attributes(),
+            'excluded': tuple(excluded),
+            'excluded_by': tuple(excluded_by),
+            'parent': parent,
+            'active_variants': frozenset(active_variants),
+            'archived': tuple(
+                (mask, ids) for mask, ids in archived.items() if mask not in active_variants
+            ),
+        }
+
+    def _get_attribute_exclusions(self, parent_combination=None, parent_name=None, combination_ids=None):
+        """Same result as the standard method, answered from the compiled exclusions"""
+        self.ensure_one()
+        parent_combination = parent_combination or self.env['product.template.attribute.value']
+        return dict(
+            self._get_combination_exclusions(parent_combination.ids, combination_ids),
+            parent_combination=parent_combination.ids,
+            parent_product_name=parent_name,
+            mapped_attribute_names=self._get_mapped_attribute_names(parent_combination),
+        )
+
+    def _get_combination_exclusions(self, parent_ptav_ids, combination_ids=None):
+        """Return the ``exclusions``, ``archived_combinations`` and
+        ``parent_exclusions`` of the template, without the parent naming data
+        of ``_get_attribute_exclusions``, so callers resolving many templates
+        against the same parent combination only pay for what they use.
+
+        :param list parent_ptav_ids: ids of the parent combination values
+        :param list combination_ids: ids of the current combination values
+        """
+        self.ensure_one()
+        compiled = self._get_compiled_exclusions()
+        ptav_ids = compiled['ptav_ids']
+
+        # values listed: the active ones and those of the current combination
+        listed_mask = compiled['active_mask']
+        for index, ptav_id in enumerate(ptav_ids):
+            if combination_ids and ptav_id in combination_ids:
+                listed_mask |= 1 << index
+
+        exclusions = {
+            ptav_id: _mask_to_ids(
+                ptav_ids,
+                compiled['excluded'][index] | (compiled['excluded_by'][index] & listed_mask),
+            )
+            for index, ptav_id in enumerate(ptav_ids)
+            if listed_mask >> index & 1
+        }
+        return {
+            'exclusions': exclusions,
+            'archived_combinations': [
+                list(ids) for mask, ids in compiled['archived'] if mask & ~listed_mask == 0
+            ],
+            'parent_exclusions': {
+                ptav_id: _mask_to_ids(ptav_ids, compiled['parent'][ptav_id])
+                for ptav_id in parent_ptav_ids
+                if ptav_id in compiled['parent']
+            },
+        }
+
+    def _get_first_possible_combination(self, parent_combination=None, necessary_values=None):
+        """Depth-first search over the compiled exclusions: values excluded by
+        the parent combination or by an already chosen value are skipped
+        without building the intermediate combinations."""
+        if necessary_values or not self.active:
+            return super()._get_first_possible_combination(parent_combination, necessary_values)
+        self.ensure_one()
+        compiled = self._get_compiled_exclusions()
+        lines = compiled['lines']
+
+        blocked = 0
+        for ptav_id in (parent_combination or self.env['product.template.attribute.value']).ids:
+            blocked |= compiled['parent'].get(ptav_id, 0)
+
+        archived = {mask for mask, _ids in compiled['archived']}
+
+        def walk(depth, chosen, blocked):
+            if depth == len(lines):
+                variant = chosen & compiled['variant_mask']
+                if compiled['has_dynamic']:
+                    return chosen if variant not in archived else None
+                return chosen if variant in compiled['active_variants'] else None
+            for index in lines[depth]:
+                if blocked >> index & 1:
+                    continue
+                found = walk(
+                    depth + 1,
+                    chosen | 1 << index,
+                    blocked | compiled['excluded'][index] | compiled['excluded_by'][index],
+                )
+                if found is not None:
+                    return found
+            return None
+
+        found = walk(0, 0, blocked) if lines else None
+        if not found:
+            return self.env['product.template.attribute.value']
+        # keep the order of the attribute lines
+        ptav_ids = compiled['ptav_ids']
+        return self.env['product.template.attribute.value'].browse([
+            ptav_ids[index] for line in lines for index in line if found >> index & 1
+        ])
+
+    # ------------------------------------------------------------------
+    # Variant materialization
+    # ------------------------------------------------------------------
+    def _materialize_variants(self, combinations):
+        """Return the variant of each combination, creating the missing ones.
+
+        Safe to call concurrently and repeatedly for the same combinations.
+        Existing variants are returned as they are. Missing ones are created
+        in sorted signature order, under a transaction level advisory lock per
+        signature: the lock does not make the check-then-create atomic (the
+        transaction snapshot predates it), it only queues concurrent creators
+        in the same order so batches cannot deadlock on the unique index.
+        A creator that loses the race hits the unique index and picks up the
+        variant committed by the winner, read from a separate cursor.
+
+        Such a variant is not visible in the current transaction snapshot:
+        browsing it or referencing it from a new record in this transaction
+        fails. The ids are only meant to be returned to the client, which
+        uses them in later requests.
+
+        :param list combinations: product.template.attribute.value recordsets
+        :return: list of product.product ids (False when no variant applies),
+            in the order of ``combinations``
+        """
+        self.ensure_one()
+        variants = self._get_variants_for_combinations(combinations)
+        result = [variant.id if variant.active else False for variant in variants]
+
+        missing = {}
+        for index, (combination, variant_id) in enumerate(zip(combinations, result)):
+            if not variant_id:
+                signature = combination._without_no_variant_attributes()._ids2str()
+                missing.setdefault(signature, (combination, []))[1].append(index)
+
+        # sorted signatures: concurrent batches queue on their locks in the same order
+        for signature in sorted(missing):
+            combination, indexes = missing[signature]
+            self.env.cr.execute(SQL(
+                "SELECT pg_advisory_xact_lock(%s, hashtext(%s))",
+                self.id, signature,
+            ))
+            try:
+                with self.env.cr.savepoint():
+                    variant_id = self._create_product_variant(combination).id
+            except errors.UniqueViolation:
+                # drop the cached values of the rolled back variant
+                self.env.invalidate_all()
+                variant_id = self._get_committed_variant_id(signature)
+                _logger.info(f"🔁 Variant {signature} of template {self.id} created concurrently: {variant_id}")
+            for index in indexes:
+                result[index] = variant_id or False
+        return result
+
+    def _get_committed_variant_id(self, signature):
+        """Active variant of ``signature`` as committed by other transactions,
+        which the snapshot of the current one cannot see."""
+        with self.env.registry.cursor() as cr:
+            cr.execute(SQL(
+                """
+                SELECT id FROM product_product
+                 WHERE product_tmpl_id = %s AND COALESCE(combination_indices, '') = %s AND active
+                 LIMIT 1
+                """,
+                self.id, signature,
+            ))
+            row = cr.fetchone()
+        return row and row[0]
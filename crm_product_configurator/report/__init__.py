@@ -0,0 +1,3 @@
+# -*- coding: utf-8 -*-
+
+from . import crm_material_line_report
@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+import logging
+
+from odoo import api, fields, models
+from odoo.tools import SQL
+from odoo.tools.sql import create_index, create_unique_index, drop_view_if_exists
+
+_logger = logging.getLogger(__name__)
+
+
+def _create_materialized_view(cr, table, query, index_columns):
+    drop_view_if_exists(cr, table)
+    cr.execute(SQL("CREATE MATERIALIZED VIEW %s AS (%s)", SQL.identifier(table), query))
+    # REFRESH ... CONCURRENTLY requires a unique index
+    create_unique_index(cr, f'{table}_id_uniq', table, ['id'])
+    for columns in index_columns:
+        create_index(cr, f"{table}__{'_'.join(columns)}_index", table, columns)
+
+
+def _refresh_materialized_view(env, table):
+    """Recompute a materialized view without blocking readers."""
+    env.flush_all()
+    env.cr.execute(SQL("REFRESH MATERIALIZED VIEW CONCURRENTLY %s", SQL.identifier(table)))
+    env.invalidate_all()
+    _logger.info("Refreshed %s", table)
+
+
+class CrmMaterialLineReport(models.Model):
+    """Quoted materials flattened for pivot and graph views.
+
+    One row per material line, with the line as id, so measures add up
+    across any grouping. Dimensions are exposed as columns; the breakdown by
+    attributes_json entry lives in crm.material.line.attribute.report.
+    Backed by a materialized view refreshed by cron.
+    """
+    _name = "crm.material.line.report"
+    _description = "Material Line Analysis"
+    _auto = False
+    _rec_name = 'material_line_id'
+    _order = 'date desc'
+
+    material_line_id = fields.Many2one('crm.material.line', string="Material Line", readonly=True)
+    lead_id = fields.Many2one('crm.lead', string="Opportunity", readonly=True)
+    lead_type = fields.Selection([('lead', "Lead"), ('opportunity', "Opportunity")], string="Type", readonly=True)
+    stage_id = fields.Many2one('crm.stage', string="Stage", readonly=True)
+    user_id = fields.Many2one('res.users', string="Salesperson", readonly=True)
+    team_id = fields.Many2one('crm.team', string="Sales Team", readonly=True)
+    partner_id = fields.Many2one('res.partner', string="Customer", readonly=True)
+    company_id = fields.Many2one('res.company', string="Company", readonly=True)
+    pricelist_id = fields.Many2one('product.pricelist', string="Pricelist", readonly=True)
+    currency_id = fields.Many2one('res.currency', string="Currency", readonly=True)
+    date = fields.Datetime(string="Created On", readonly=True)
+    active = fields.Boolean(string="Active", readonly=True)
+
+    product_tmpl_id = fields.Many2one('product.template', string="Product", readonly=True)
+    product_id = fields.Many2one('product.product', string="Variant", readonly=True)
+    categ_id = fields.Many2one('product.category', string="Product Category", readonly=True)
+    product_uom_id = fields.Many2one('uom.uom', string="UOM", readonly=True)
+    raisin_type_id = fields.Many2one('raisin.type', string="Raisin Type", readonly=True)
+    attribute_summary = fields.Char(string="Attributes", readonly=True)
+
+    quantity = fields.Float(string="Quantity", readonly=True)
+    price = fields.Float(string="Unit Price", readonly=True, aggregator='avg')
+    price_total = fields.Monetary(string="Total Price", readonly=True)
+    width = fields.Float(string="Width", readonly=True, aggregator='avg')
+    thickness = fields.Float(string="Thickness", readonly=True, aggregator='avg')
+    height = fields.Float(string="Height", readonly=True, aggregator='avg')
+    length = fields.Float(string="Length", readonly=True, aggregator='avg')
+
+    def _query(self):
+        return SQL("""
+            SELECT
+                line.id AS id,
+                line.id AS material_line_id,
+                line.lead_id AS lead_id,
+                lead.type AS lead_type,
+                lead.stage_id AS stage_id,
+                lead.user_id AS user_id,
+                lead.team_id AS team_id,
+                lead.active AS active,
+                lead.create_date AS date,
+                line.partner_id AS partner_id,
+                line.company_id AS company_id,
+                line.pricelist_id AS pricelist_id,
+                line.currency_id AS currency_id,
+                line.product_template_id AS product_tmpl_id,
+                line.product_id AS product_id,
+                COALESCE(line.product_category_id, template.categ_id) AS categ_id,
+                line.product_uom_id AS product_uom_id,
+                line.raisin_type_id AS raisin_type_id,
+                line.attribute_summary AS attribute_summary,
+                line.quantity AS quantity,
+                line.price AS price,
+                COALESCE(line.quantity, 0) * COALESCE(line.price, 0) AS price_total,
+                line.width AS width,
+                line.thickness AS thickness,
+                line.height AS height,
+                line.length AS length
+            FROM crm_material_line line
+            JOIN crm_lead lead ON lead.id = line.lead_id
+            LEFT JOIN product_template template ON template.id = line.product_template_id
+        """)
+
+    def init(self):
+        _create_materialized_view(self.env.cr, self._table, self._query(), [
+            ['lead_id'], ['stage_id'], ['partner_id'], ['categ_id'], ['date'],
+        ])
+
+    @api.model
+    def _refresh(self):
+        """Recompute the materialized views of the analysis without blocking readers."""
+        _refresh_materialized_view(self.env, self._table)
+        self.env['crm.material.line.attribute.report']._refresh()
+
+
+class CrmMaterialLineAttributeReport(models.Model):
+    """Material lines broken down by attributes_json entry.
+
+    One row per line and attribute (lines without attributes are left out).
+    It carries no quantity or price measure, since a line appears once per
+    attribute: count lines per attribute value instead. Ids are derived from
+    the line and the position of the key, so they are stable across
+    refreshes as long as the line's attribute keys do not change.
+    """
+    _name = "crm.material.line.attribute.report"
+    _description = "Material Line Attribute Analysis"
+    _auto = False
+    _rec_name = 'attribute_name'
+    _order = 'date desc'
+
+    material_line_id = fields.Many2one('crm.material.line', string="Material Line", readonly=True)
+    lead_id = fields.Many2one('crm.lead', string="Opportunity", readonly=True)
+    lead_type = fields.Selection([('lead', "Lead"), ('opportunity', "Opportunity")], string="Type", readonly=True)
+    stage_id = fields.Many2one('crm.stage', string="Stage", readonly=True)
+    partner_id = fields.Many2one('res.partner', string="Customer", readonly=True)
+    company_id = fields.Many2one('res.company', string="Company", readonly=True)
+    date = fields.Datetime(string="Created On", readonly=True)
+    active = fields.Boolean(string="Active", readonly=True)
+    product_tmpl_id = fields.Many2one('product.template', string="Product", readonly=True)
+    categ_id = fields.Many2one('product.category', string="Product Category", readonly=True)
+
+    attribute_name = fields.Char(string="Attribute", readonly=True)
+    attribute_value = fields.Char(string="Attribute Value", readonly=True)
+    attribute_value_num = fields.Float(string="Attribute Value (Numeric)", readonly=True, aggregator='avg')
+
+    def _query(self):
+        return SQL("""
+            SELECT
+                line.id::bigint * 1000 + attr.position AS id,
+                line.id AS material_line_id,
+                line.lead_id AS lead_id,
+                lead.type AS lead_type,
+                lead.stage_id AS stage_id,
+                lead.active AS active,
+                lead.create_date AS date,
+                line.partner_id AS partner_id,
+                line.company_id AS company_id,
+                line.product_template_id AS product_tmpl_id,
+                COALESCE(line.product_category_id, template.categ_id) AS categ_id,
+                split_part(attr.key, '__', 1) AS attribute_name,
+                attr.value AS attribute_value,
+                CASE WHEN attr.value ~ '^\\s*-?[0-9]+(\\.[0-9]+)?\\s*$'
+                     THEN attr.value::numeric END AS attribute_value_num
+            FROM crm_material_line line
+            JOIN crm_lead lead ON lead.id = line.lead_id
+            LEFT JOIN product_template template ON template.id = line.product_template_id
+            JOIN LATERAL jsonb_each_text(
+                CASE WHEN jsonb_typeof(line.attributes_json) = 'object'
+                     THEN line.attributes_json ELSE '{}'::jsonb END
+            ) WITH ORDINALITY AS attr(key, value, position) ON TRUE
+        """)
+
+    def init(self):
+        _create_materialized_view(self.env.cr, self._table, self._query(), [
+            ['lead_id'], ['stage_id'], ['categ_id'], ['date'], ['attribute_name', 'attribute_value'],
+        ])
+
+    @api.model
+    def _refresh(self):
+        """Recompute the materialized view without blocking readers."""
+        _refresh_materialized_view(self.env, self._table)
@@ -3,6 +3,7 @@
 import { Many2OneField } from "@web/views/fields/many2one/many2one_field";
 import { useService } from "@web/core/utils/hooks";
 import { x2ManyCommands } from "@web/core/orm_service";
+import { rpc } from "@web/core/network/rpc";
 import { registry } from "@web/core/registry";
 import { _t } from "@web/core/l10n/translation";
 import { useEffect } from "@odoo/owl";
@@ -60,16 +61,25 @@ export class CrmProductMany2One extends Many2OneField {
         }
 
         try {
-            const variantInfo = await this.orm.call('product.template', 'get_single_product_variant', [templateId]);
-            const [configMode] = await this.orm.read('product.template', [templateId], ['product_config_mode']);
+            // One request: mode, single variant and, when needed, the dialog values
+            const bootstrap = await rpc('/crm_product_configurator/bootstrap', {
+                ...this._getConfiguratorParams(
+                    record,
+                    templateId,
+                    (record.data.product_template_attribute_value_ids?.records || []).map(r => r.resId)
+                ),
+                only_main_product: false,
+                check_single_variant: true,
+            });
+            const variantInfo = bootstrap.single_variant;
 
             if (variantInfo?.product_id) {
                 await record.update({
                     product_id: [variantInfo.product_id.id, variantInfo.product_id.display_name],
                 });
             } else {
-                if (!configMode?.product_config_mode || configMode.product_config_mode === 'configurator') {
-                    this._openConfigurator(false);
+                if (!bootstrap.product_config_mode || bootstrap.product_config_mode === 'configurator') {
+                    this._openConfigurator(false, bootstrap);
                 } else {
                     this._openGridConfigurator(false);
                 }
@@ -78,7 +88,18 @@ export class CrmProductMany2One extends Many2OneField {
         }
     }
 
-    async _openConfigurator(edit = false) {
+    _getConfiguratorParams(record, templateId, ptavIds) {
+        return {
+            product_template_id: templateId,
+            currency_id: record.data.currency_id?.[0],
+            quantity: record.data.quantity || 1.0,
+            product_uom_id: record.data.product_uom?.[0],
+            company_id: record.data.company_id?.[0],
+            ptav_ids: ptavIds,
+        };
+    }
+
+    async _openConfigurator(edit = false, bootstrapData = undefined) {
         
         const record = this.props.record;
         const templateId = record?.data?.product_template_id?.[0];
@@ -108,6 +129,7 @@ export class CrmProductMany2One extends Many2OneField {
             currencyId: record.data.currency_id?.[0],
             crmLeadId: record?.data?.lead_id?.[0] || false,
             edit,
+            bootstrapData,
             save: async (mainProduct, optionalProducts) => {
                 await this.applyProduct(record, mainProduct);
                 for (const opt of optionalProducts || []) {
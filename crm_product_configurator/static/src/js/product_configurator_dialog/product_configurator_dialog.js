@@ -4,7 +4,12 @@ import { _t } from "@web/core/l10n/translation";
 import { Component, onWillStart, useState, useSubEnv, useEffect } from "@odoo/owl";
 import { Dialog } from '@web/core/dialog/dialog';
 import { CrmProductList } from "../product_list/product_list";
-import { rpc } from "@web/core/network/rpc";
+import { rpc, ConnectionAbortedError } from "@web/core/network/rpc";
+
+// delay before a combination change is sent, so fast clicks collapse into one call
+const COMBINATION_DEBOUNCE_DELAY = 150;
+// neighbour combinations (one value switched) prefetched along the current one
+const MAX_PREFETCHED_COMBINATIONS = 20;
 
 export class crmProductConfiguratorDialog extends Component {
     static components = { Dialog, CrmProductList };
@@ -26,6 +31,8 @@ export class crmProductConfiguratorDialog extends Component {
         currencyId: { type: Number, optional: true },
         crmLeadId: Number,
         edit: { type: Boolean, optional: true },
+        // configurator values already fetched by the caller (bootstrap route)
+        bootstrapData: { type: Object, optional: true },
         save: Function,
         discard: Function,
         close: Function,
@@ -61,10 +68,17 @@ export class crmProductConfiguratorDialog extends Component {
             autoFillWidthFromM2O: this.autoFillWidthFromM2O.bind(this),
         });
 
+        // update_combination results of this dialog, by template/combination/quantity
+        this.combinationCache = new Map();
+        // latest combination update per template, older ones are stale
+        this.combinationSequences = {};
+        this.combinationRequests = {};
+
         useEffect(() => { }, () => [this.state.products]);
 
         onWillStart(async () => {
-            const { products, optional_products } = await this._loadData(this.props.edit);
+            const { products, optional_products } =
+                this.props.bootstrapData || (await this._loadData(this.props.edit));
             this.state.products = products;
             this.state.optionalProducts = optional_products;
             this._setDefaultThickness();
@@ -81,8 +95,6 @@ export class crmProductConfiguratorDialog extends Component {
                 this._checkExclusions(this.state.products[0]);
             }
 
-            // 🔥 NEW: Fetch is_width_check manually since backend might not send it
-            await this._enrichAttributesWithWidthCheck();
         });
     }
 
@@ -118,84 +130,6 @@ export class crmProductConfiguratorDialog extends Component {
         this.state.products = [...this.state.products];
     }
 
-    // 🔥 NEW: Helper to fetch is_width_check AND m2o_model_technical_name
-    async _enrichAttributesWithWidthCheck() {
-        const allProducts = [...this.state.products, ...this.state.optionalProducts];
-        const attributeIds = new Set();
-
-        for (const product of allProducts) {
-            for (const ptal of product.attribute_lines || []) {
-                if (ptal.attribute && ptal.attribute.id) {
-                    attributeIds.add(ptal.attribute.id);
-                }
-            }
-        }
-
-        if (attributeIds.size === 0) return;
-
-        try {
-            // Fetch is_width_check AND m2o_model_id
-            const attributesData = await this.rpc("/web/dataset/call_kw/product.attribute/read", {
-                model: "product.attribute",
-                method: "read",
-                args: [[...attributeIds], ["is_width_check", "m2o_model_id", "pair_with_previous"]],
-                kwargs: {},
-            });
-
-            // Collect ir.model IDs
-            const irModelIds = new Set();
-            const attrToIrModelId = {};
-
-            for (const attr of attributesData) {
-                if (attr.m2o_model_id) {
-                    // m2o_model_id is [id, name]
-                    const irModelId = Array.isArray(attr.m2o_model_id) ? attr.m2o_model_id[0] : attr.m2o_model_id;
-                    if (irModelId) {
-                        irModelIds.add(irModelId);
-                        attrToIrModelId[attr.id] = irModelId;
-                    }
-                }
-            }
-
-            // Fetch model names from ir.model
-            const irModelMap = {};
-            if (irModelIds.size > 0) {
-                const irModelsData = await this.rpc("/web/dataset/call_kw/ir.model/read", {
-                    model: "ir.model",
-                    method: "read",
-                    args: [[...irModelIds], ["model"]],
-                    kwargs: {},
-                });
-                for (const m of irModelsData) {
-                    irModelMap[m.id] = m.model;
-                }
-            }
-
-            const attributeMap = {};
-            for (const attr of attributesData) {
-                attributeMap[attr.id] = {
-                    is_width_check: attr.is_width_check,
-                    m2o_model_technical_name: attrToIrModelId[attr.id] ? irModelMap[attrToIrModelId[attr.id]] : false,
-                    pair_with_previous: attr.pair_with_previous, // 🔥 NEW
-                };
-            }
-
-            // Update state
-            for (const product of allProducts) {
-                for (const ptal of product.attribute_lines || []) {
-                    if (ptal.attribute && attributeMap[ptal.attribute.id]) {
-                        ptal.attribute.is_width_check = attributeMap[ptal.attribute.id].is_width_check;
-                        ptal.attribute.m2o_model_technical_name = attributeMap[ptal.attribute.id].m2o_model_technical_name;
-                        ptal.attribute.pair_with_previous = attributeMap[ptal.attribute.id].pair_with_previous; // 🔥 NEW
-                    }
-                }
-            }
-            console.log("✅ Enriched attributes:", attributeMap);
-        } catch (err) {
-            console.error("❌ Failed to fetch attribute details:", err);
-        }
-    }
-
     // 🔥 NEW: Store file upload in state
     _updateFileUpload(productTmplId, ptalId, filePayload) {
         const key = `${productTmplId}_${ptalId}`;
@@ -293,7 +227,7 @@ export class crmProductConfiguratorDialog extends Component {
             ptav_ids: this.props.ptavIds,
             only_main_product: onlyMainProduct,
         };
-        return await this.rpc('/crm_product_configurator/get_values', params);
+        return await this.rpc('/crm_product_configurator/bootstrap', params);
     }
 
     async _createProduct(product) {
@@ -303,10 +237,82 @@ export class crmProductConfiguratorDialog extends Component {
         });
     }
 
-    async _updateCombination(product, quantity) {
-        return this.rpc('/crm_product_configurator/update_combination', {
-            product_template_id: product.product_tmpl_id,
-            combination: this._getCombination(product),
+    async _createProducts(products) {
+        return this.rpc('/crm_product_configurator/create_products', {
+            products: products.map(product => ({
+                product_template_id: product.product_tmpl_id,
+                combination: this._getCombination(product),
+            })),
+        });
+    }
+
+    _getCombinationKey(productTmplId, combination, quantity) {
+        return `${productTmplId}|${[...combination].sort((a, b) => a - b).join(",")}|${quantity || 0}`;
+    }
+
+    /**
+     * Return the combinations differing from the product's current one by a
+     * single value of a single-choice attribute, the likely next selections.
+     * When given, only the values of `ptalId` are switched.
+     */
+    _getNeighbourCombinations(product, ptalId) {
+        const neighbours = [];
+        for (const ptal of product.attribute_lines) {
+            if ((ptalId && ptal.id !== ptalId) || ptal.attribute.display_type === "multi") {
+                continue;
+            }
+            for (const ptav of ptal.attribute_values) {
+                if (ptav.excluded || ptal.selected_attribute_value_ids.includes(ptav.id)) {
+                    continue;
+                }
+                neighbours.push(product.attribute_lines.flatMap(
+                    line => line === ptal ? [ptav.id] : line.selected_attribute_value_ids
+                ));
+            }
+        }
+        return neighbours;
+    }
+
+    /**
+     * Return the information of the product's current combination, served
+     * from the dialog cache when already known. Calls are debounced per
+     * product and a newer call aborts the pending one: superseded calls
+     * resolve to `null` and must be ignored by the caller. Uncached neighbour
+     * combinations are fetched in the same request.
+     */
+    async _updateCombination(product, quantity, ptalId = false) {
+        const productTmplId = product.product_tmpl_id;
+        const combination = this._getCombination(product);
+        const key = this._getCombinationKey(productTmplId, combination, quantity);
+        const sequence = (this.combinationSequences[productTmplId] || 0) + 1;
+        this.combinationSequences[productTmplId] = sequence;
+        this.combinationRequests[productTmplId]?.abort();
+        const isStale = () => this.combinationSequences[productTmplId] !== sequence;
+
+        if (this.combinationCache.has(key)) {
+            return this.combinationCache.get(key);
+        }
+        await new Promise(resolve => setTimeout(resolve, COMBINATION_DEBOUNCE_DELAY));
+        if (isStale()) {
+            return null;
+        }
+
+        const candidates = [combination];
+        const candidateKeys = new Set([key]);
+        for (const neighbour of this._getNeighbourCombinations(product, ptalId)) {
+            if (candidates.length > MAX_PREFETCHED_COMBINATIONS) {
+                break;
+            }
+            const neighbourKey = this._getCombinationKey(productTmplId, neighbour, quantity);
+            if (!this.combinationCache.has(neighbourKey) && !candidateKeys.has(neighbourKey)) {
+                candidateKeys.add(neighbourKey);
+                candidates.push(neighbour);
+            }
+        }
+
+        const request = this.rpc('/crm_product_configurator/update_combination', {
+            product_template_id: productTmplId,
+            combinations: candidates,
             currency_id: this.props.currencyId,
             so_date: this.props.soDate,
             quantity: quantity || 0.0,
@@ -314,6 +320,24 @@ export class crmProductConfiguratorDialog extends Component {
             company_id: this.props.companyId,
             pricelist_id: this.props.pricelistId,
         });
+        this.combinationRequests[productTmplId] = request;
+        let results;
+        try {
+            results = await request;
+        } catch (error) {
+            if (error instanceof ConnectionAbortedError) {
+                return null;
+            }
+            throw error;
+        } finally {
+            if (this.combinationRequests[productTmplId] === request) {
+                delete this.combinationRequests[productTmplId];
+            }
+        }
+        candidates.forEach((candidate, index) => this.combinationCache.set(
+            this._getCombinationKey(productTmplId, candidate, quantity), results[index]
+        ));
+        return isStale() ? null : results[0];
     }
 
     async _getOptionalProducts(product) {
@@ -373,17 +397,21 @@ export class crmProductConfiguratorDialog extends Component {
         if (quantity <= 0) {
             if (productTmplId === this.env.mainProductTmplId) {
                 const product = this._findProduct(productTmplId);
-                const { price } = await this._updateCombination(product, 1);
                 product.quantity = 1;
-                product.price = parseFloat(price);
+                const updatedValues = await this._updateCombination(product, 1);
+                if (updatedValues) {
+                    product.price = parseFloat(updatedValues.price);
+                }
                 return;
             }
             this._removeProduct(productTmplId);
         } else {
             const product = this._findProduct(productTmplId);
-            const { price } = await this._updateCombination(product, quantity);
             product.quantity = quantity;
-            product.price = parseFloat(price);
+            const updatedValues = await this._updateCombination(product, quantity);
+            if (updatedValues) {
+                product.price = parseFloat(updatedValues.price);
+            }
         }
     }
 
@@ -403,7 +431,10 @@ export class crmProductConfiguratorDialog extends Component {
         product.attribute_lines.find(ptal => ptal.id === ptalId).selected_attribute_value_ids = selectedIds;
         this._checkExclusions(product);
         if (this._isPossibleCombination(product)) {
-            const updatedValues = await this._updateCombination(product, product.quantity);
+            const updatedValues = await this._updateCombination(product, product.quantity, ptalId);
+            if (!updatedValues) {
+                return;
+            }
             Object.assign(product, updatedValues);
             if (!product.id && product.attribute_lines.every(ptal => ptal.create_variant === "always")) {
                 const combination = this._getCombination(product);
@@ -531,14 +562,17 @@ export class crmProductConfiguratorDialog extends Component {
     async onConfirm() {
         if (!this.isPossibleConfiguration()) return;
 
-        for (const product of this.state.products) {
-            const needsVariant = !product.id && product.attribute_lines?.some(
+        // Create the missing dynamic variants in one call
+        const productsToCreate = this.state.products.filter(
+            product => !product.id && product.attribute_lines?.some(
                 ptal => ptal.create_variant === "dynamic"
-            );
-            if (needsVariant) {
-                const productId = await this._createProduct(product);
-                product.id = parseInt(productId);
-            }
+            )
+        );
+        if (productsToCreate.length) {
+            const productIds = await this._createProducts(productsToCreate);
+            productsToCreate.forEach((product, index) => {
+                product.id = parseInt(productIds[index]);
+            });
         }
 
         const mainProduct = this.state.products.find(
@@ -3,7 +3,6 @@
 import { Component } from "@odoo/owl";
 import { formatCurrency } from "@web/core/currency";
 import { onMounted } from "@odoo/owl";
-import { rpc } from "@web/core/network/rpc";
 
 export class ProductTemplateAttributeLine extends Component {
     static template = "crmProductConfigurator.ptal";
@@ -34,6 +33,7 @@ export class ProductTemplateAttributeLine extends Component {
                 m2o_values: { type: Array, element: Object, optional: true },
                 pair_with_previous: { type: Boolean, optional: true },
                 is_width_check: { type: Boolean, optional: true }, // 🔥 NEW
+                is_quantity: { type: Boolean, optional: true },
                 m2o_model_technical_name: { type: [String, Boolean], optional: true }, // 🔥 NEW
 
             },
@@ -236,14 +236,9 @@ export class ProductTemplateAttributeLine extends Component {
             this.props.attribute.m2o_model_technical_name === "profile.name"
         ) {
             console.log(`🔍 M2O selected for profile.name. ResID: ${resId}`);
-            const result = await rpc("/web/dataset/call_kw/profile.name/read", {
-                model: "profile.name",
-                method: "read",
-                args: [[resId], ["width"]],
-                kwargs: {},
-            });
-
-            const width = result?.length ? result[0].width : "";
+            // widths come with the m2o values of the configurator payload
+            const profile = (this.props.attribute.m2o_values || []).find((rec) => rec.id === resId);
+            const width = profile?.width ?? "";
             console.log(`📏 Fetched width: ${width}`);
 
             if (this.env.autoFillWidthFromM2O) {
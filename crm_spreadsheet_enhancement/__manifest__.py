@@ -5,7 +5,7 @@
     'author': "Entrivis Tech",
     'website': "https://www.entrivistech.com",
     'category': 'CRM',
-    'version': '18.0.1.0.0',
+    'version': '18.0.1.2.0',
     'depends': [
         'base',
         'crm_customisation',
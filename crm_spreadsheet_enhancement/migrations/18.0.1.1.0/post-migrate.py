@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+import logging
+
+import psycopg2
+
+from odoo.tools.sql import column_exists
+
+from odoo.addons.crm_spreadsheet_enhancement.models.spreadsheet_storage import compress_document
+
+_logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 100
+
+
+def migrate(cr, version):
+    """Move the plain text raw_spreadsheet_data documents to the compressed
+    column and drop the old column."""
+    if not version:
+        return
+    for table in ('crm_lead_spreadsheet', 'sale_order_spreadsheet'):
+        if not column_exists(cr, table, 'raw_spreadsheet_data'):
+            continue
+        migrated = 0
+        while True:
+            cr.execute(f"""
+                SELECT id, raw_spreadsheet_data
+                  FROM {table}
+                 WHERE raw_spreadsheet_data IS NOT NULL
+                   AND raw_spreadsheet_data_compressed IS NULL
+                 LIMIT %s
+            """, [BATCH_SIZE])
+            rows = cr.fetchall()
+            if not rows:
+                break
+            for record_id, text in rows:
+                frame = compress_document(text)
+                cr.execute(
+                    f"UPDATE {table} SET raw_spreadsheet_data_compressed = %s, raw_spreadsheet_data = NULL WHERE id = %s",
+                    [frame and psycopg2.Binary(frame) or None, record_id],
+                )
+            migrated += len(rows)
+        cr.execute(f"ALTER TABLE {table} DROP COLUMN raw_spreadsheet_data")
+        _logger.info("Compressed %s spreadsheet documents of %s", migrated, table)
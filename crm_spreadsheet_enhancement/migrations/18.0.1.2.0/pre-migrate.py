@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+def migrate(cr, version):
+    """Keep one calculator per sales order before the unique order_id index
+    is created: the one the order points to, else the most recent one. The
+    other calculators are detached from the order, not deleted."""
+    if not version:
+        return
+    cr.execute("""
+        WITH ranked AS (
+            SELECT s.id,
+                   row_number() OVER (
+                       PARTITION BY s.order_id
+                       ORDER BY (s.id = so.spreadsheet_id) DESC NULLS LAST, s.id DESC
+                   ) AS rank
+              FROM sale_order_spreadsheet s
+              JOIN sale_order so ON so.id = s.order_id
+        )
+        UPDATE sale_order_spreadsheet s
+           SET order_id = NULL
+          FROM ranked
+         WHERE ranked.id = s.id
+           AND ranked.rank > 1
+    """)
+    _logger.info("Detached %s duplicate calculators from their sales order", cr.rowcount)
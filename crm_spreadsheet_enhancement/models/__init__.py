@@ -1,9 +1,12 @@
 # -*- coding: utf-8 -*-
 
+from . import spreadsheet_storage
 from . import crm_lead
+from . import crm_material_line
 from . import crm_quatation_template
 from . import crm_quote_spreadsheet
 from . import res_config_settings
 from . import sale_spreadsheet
+from . import sale_order
 # from . import res_company
 # from . import product_category
\ No newline at end of file
@@ -2,6 +2,9 @@
 
 from odoo import api, fields, models
 import logging
+
+from psycopg2 import errors
+
 _logger = logging.getLogger(__name__)
 
 class CrmLead(models.Model):
@@ -9,6 +12,13 @@ class CrmLead(models.Model):
     
     
     template_id = fields.Many2one('crm.quotation.template', string='Quotation Template') 
+    applied_template_id = fields.Many2one(
+        'crm.quotation.template',
+        string="Applied Quotation Template",
+        copy=False,
+        readonly=True,
+        help="Quotation template whose material lines were added to the opportunity.",
+    )
     
     quote_calculator_id = fields.Many2one(
         'crm.lead.spreadsheet',
@@ -55,6 +65,25 @@ class CrmLead(models.Model):
                 res['template_id'] = int(template_id_str)
         return res
 
+    def action_apply_quotation_template(self):
+        """Add the material lines of the quotation template to the opportunities.
+
+        All lines are created in one call, so each calculator receives a
+        single revision holding the sheets of the new lines. Opportunities
+        the template was already applied to are skipped.
+        """
+        leads = self.filtered(lambda lead: lead.template_id and lead.applied_template_id != lead.template_id)
+        vals_list = []
+        for lead in leads:
+            vals_list.extend(lead.template_id._prepare_material_line_vals_list(lead))
+        if not vals_list:
+            return True
+        self.env['crm.material.line'].create(vals_list)
+        for template, template_leads in leads.grouped('template_id').items():
+            template_leads.applied_template_id = template
+        _logger.info(f"✅ Applied quotation templates: {len(vals_list)} material line(s) created")
+        return True
+
     @api.depends('spreadsheet_ids')
     def _compute_spreadsheet_id(self):
         for lead in self:
@@ -89,5 +118,98 @@ class CrmLead(models.Model):
         for lead in self:
             if lead.spreadsheet_ids:
                 lead.spreadsheet_ids.unlink()
-        return super().unlink()   
+        return super().unlink()
 
+    def _create_sales_spreadsheet_with_data(self, sale_order):
+        """Create sales spreadsheet with converted CRM data - FULLY FIXED"""
+        self.ensure_one()
+        
+        _logger.info(f"\n🔵 [CREATE SALES SPREADSHEET] Starting for Lead {self.id}, Order {sale_order.id}")
+        
+        # ✅ STEP 1: Find CRM spreadsheet
+        crm_spreadsheet = self.env['crm.lead.spreadsheet'].search([
+            ('lead_id', '=', self.id)
+        ], limit=1)
+        
+        if not crm_spreadsheet:
+            _logger.warning(f"⚠️ No CRM spreadsheet found for lead {self.id}")
+            return False
+            
+        if not crm_spreadsheet.exists():
+            _logger.warning(f"⚠️ CRM spreadsheet was deleted for lead {self.id}")
+            return False
+            
+        if not crm_spreadsheet.raw_spreadsheet_data:
+            _logger.warning(f"⚠️ CRM spreadsheet {crm_spreadsheet.id} has no data")
+            return False
+        
+        _logger.info(f"✅ Found CRM spreadsheet: {crm_spreadsheet.id}")
+        
+        # ✅ STEP 2: Convert CRM data to Sales format
+        try:
+            sales_data_json = self._convert_crm_spreadsheet_to_sales(crm_spreadsheet, sale_order)
+        except Exception as conv_error:
+            _logger.error(f"❌ CRM data conversion failed: {conv_error}", exc_info=True)
+            return False
+            
+        if not sales_data_json:
+            _logger.warning(f"⚠️ CRM data conversion returned empty")
+            return False
+        
+        _logger.info(f"✅ Converted CRM data to Sales format ({len(sales_data_json)} chars)")
+        
+        # ✅ STEP 3: Check if Sales spreadsheet already exists
+        existing_spreadsheet = self.env['sale.order.spreadsheet'].search([
+            ('order_id', '=', sale_order.id)
+        ], limit=1)
+        
+        if existing_spreadsheet:
+            _logger.info(f"ℹ️ Sales spreadsheet {existing_spreadsheet.id} already exists, updating...")
+            try:
+                existing_spreadsheet.write(
+                    existing_spreadsheet._get_converted_document_vals(sales_data_json)
+                )
+                
+                # Link CRM spreadsheet
+                if crm_spreadsheet.exists():
+                    crm_spreadsheet.sale_id = sale_order.id
+                    
+                _logger.info(f"✅ Updated existing spreadsheet {existing_spreadsheet.id}")
+                return existing_spreadsheet
+                
+            except Exception as e:
+                _logger.error(f"❌ Failed to update spreadsheet: {e}", exc_info=True)
+                return False
+        
+        # ✅ STEP 4: Create new Sales spreadsheet
+        try:
+            with self.env.cr.savepoint():
+                SaleSpreadsheet = self.env['sale.order.spreadsheet']
+                sales_spreadsheet = SaleSpreadsheet.create({
+                    'name': f"{sale_order.name} - Calculator",
+                    'order_id': sale_order.id,
+                    **SaleSpreadsheet._get_converted_document_vals(sales_data_json),
+                })
+            
+            _logger.info(f"✅ Created Sales spreadsheet: {sales_spreadsheet.id}")
+            
+            # ✅ STEP 5: Link CRM spreadsheet to Sale Order
+            if crm_spreadsheet.exists():
+                try:
+                    with self.env.cr.savepoint():
+                        crm_spreadsheet.sale_id = sale_order.id
+                    _logger.info(f"✅ Linked CRM spreadsheet {crm_spreadsheet.id} to Sale {sale_order.id}")
+                except Exception as e:
+                    _logger.error(f"⚠️ Failed to link CRM spreadsheet: {e}")
+                    # Don't fail the whole operation
+            
+            return sales_spreadsheet
+            
+        except errors.UniqueViolation:
+            # a concurrent transaction created the calculator of the order first
+            _logger.info(f"🔄 Order {sale_order.id} already has a calculator")
+            return False
+        except Exception as e:
+            # the savepoint already rolled back the failed creation
+            _logger.error(f"❌ Failed to create Sales spreadsheet: {e}", exc_info=True)
+            return False
@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+
+from odoo import api, fields, models
+
+
+class CrmMaterialLine(models.Model):
+    _inherit = "crm.material.line"
+
+    sheet_layout_key = fields.Char(
+        string="Sheet Layout Key",
+        compute='_compute_sheet_layout_key',
+        store=True,
+        index=True,
+        help="Column layout of the line, the list of its sheet in consolidated calculators filters on it.",
+    )
+
+    @api.depends('attributes_json', 'product_template_id.attribute_line_ids.attribute_id.name')
+    def _compute_sheet_layout_key(self):
+        Spreadsheet = self.env['crm.lead.spreadsheet']
+        for line in self:
+            line.sheet_layout_key = Spreadsheet._get_layout_key(
+                Spreadsheet._get_material_line_columns(line)
+            )
@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
-from odoo import models, fields, api
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError
 import logging
 
 _logger = logging.getLogger(__name__)
@@ -42,6 +43,82 @@ class CrmQuotationTemplate(models.Model):
         copy=True
     )
 
+    # -----------------------------
+    # APPLY TO OPPORTUNITIES
+    # -----------------------------
+    def _prepare_material_line_vals_list(self, lead):
+        """Return the ``crm.material.line`` values of the template lines for
+        ``lead``, variants being resolved once per product template.
+
+        Missing variants of templates with dynamic attributes are created in
+        one batch. Lines whose attribute values match no possible variant are
+        refused, material lines without a variant being dropped when the
+        configurator saves.
+        """
+        self.ensure_one()
+        lines = self.line_ids.filtered('product_template_id')
+        variants = {}
+        for product_template in lines.product_template_id:
+            template_lines = lines.filtered(lambda l: l.product_template_id == product_template)
+            variants.update(zip(template_lines, product_template._get_variants_for_combinations(
+                [line.product_template_attribute_value_ids for line in template_lines]
+            )))
+
+        to_create = {}
+        for line in lines:
+            product_template = line.product_template_id
+            combination = line.product_template_attribute_value_ids
+            if variants[line] or not product_template.has_dynamic_attributes():
+                continue
+            if not product_template._is_combination_possible(combination, ignore_no_variant=True):
+                continue
+            combination = combination._without_no_variant_attributes()
+            key = (product_template, combination._ids2str())
+            to_create.setdefault(key, (combination, []))[1].append(line)
+        if to_create:
+            created = self.env['product.product'].create([
+                {
+                    'product_tmpl_id': product_template.id,
+                    'product_template_attribute_value_ids': [(6, 0, combination.ids)],
+                }
+                for (product_template, signature), (combination, variant_lines) in to_create.items()
+            ])
+            for variant, (combination, variant_lines) in zip(created, to_create.values()):
+                variants.update(dict.fromkeys(variant_lines, variant))
+            _logger.info(f"✅ Created {len(created)} product variant(s) for quotation template {self.id}")
+
+        unresolved = lines.filtered(lambda l: not variants[l])
+        if unresolved:
+            raise UserError(_(
+                "No product variant matches the attribute values of these lines of the quotation template %(template)s:\n%(lines)s",
+                template=self.display_name,
+                lines="\n".join(
+                    f"- {line.product_template_id.display_name}: "
+                    f"{', '.join(line.product_template_attribute_value_ids.mapped('name'))}"
+                    for line in unresolved
+                ),
+            ))
+
+        vals_list = []
+        for line in lines:
+            variant = variants[line]
+            vals_list.append({
+                'lead_id': lead.id,
+                'product_template_id': line.product_template_id.id,
+                'product_id': variant.id,
+                'product_category_id': line.product_template_id.categ_id.id,
+                'product_uom_id': (variant.uom_id or line.product_template_id.uom_id).id,
+                'product_template_attribute_value_ids': [
+                    (6, 0, line.product_template_attribute_value_ids.ids)
+                ],
+                'quantity': line.quantity,
+                'width': line.width,
+                'thickness': line.thickness,
+                'height': line.height,
+                'length': line.length,
+            })
+        return vals_list
+
 
 class CrmQuotationTemplateLine(models.Model):
     _name = 'crm.quotation.template.line'
@@ -58,5 +135,20 @@ class CrmQuotationTemplateLine(models.Model):
         required=True
     )
     sequence = fields.Integer(default=10)
-    
-    
\ No newline at end of file
+    product_template_id = fields.Many2one(
+        'product.template',
+        string='Product',
+        domain=[('sale_ok', '=', True), ('crm_enabled', '=', True)],
+    )
+    product_template_attribute_value_ids = fields.Many2many(
+        'product.template.attribute.value',
+        'crm_quotation_template_line_ptav_rel',
+        'line_id', 'value_id',
+        string="Attribute Values",
+        domain="[('product_tmpl_id', '=', product_template_id)]",
+    )
+    quantity = fields.Float(string="Quantity", default=1.0)
+    width = fields.Float(string="Width")
+    thickness = fields.Float(string="Thickness")
+    height = fields.Float(string="Height")
+    length = fields.Float(string="Length")
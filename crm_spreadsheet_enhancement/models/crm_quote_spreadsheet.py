@@ -1,7 +1,11 @@
 # -*- coding: utf-8 -*-
 from odoo import api, fields, models, _
+import hashlib
 import json
 import logging
+import re
+
+from .list_payload import SchemaTable, columnar_values, pack_list_columns, rows_from_columnar
 
 _logger = logging.getLogger(__name__)
 
@@ -13,14 +17,21 @@ CRM_MATERIAL_LINE_BASE_FIELDS = [
 
 class CrmLeadSpreadsheet(models.Model):
     _name = 'crm.lead.spreadsheet'
-    _inherit = 'spreadsheet.mixin'
+    _inherit = ['spreadsheet.mixin', 'crm.spreadsheet.storage.mixin']
     _description = 'CRM Quotation Spreadsheet'
 
     name = fields.Char(required=True)
     lead_id = fields.Many2one('crm.lead', string="Opportunity", ondelete='cascade')
     sale_id = fields.Many2one('sale.order', string="Sale Order", ondelete='set null')
     company_id = fields.Many2one('res.company', default=lambda self: self.env.company)
-    raw_spreadsheet_data = fields.Text("Raw Spreadsheet Data")
+    sheet_layout = fields.Selection(
+        [('per_line', "One sheet per line"), ('consolidated', "One sheet per column layout")],
+        string="Sheet Layout",
+        default='per_line',
+        required=True,
+        help="Consolidated calculators put all material lines sharing the same "
+             "columns in a single sheet.",
+    )
 
     # ------------------------------------------------------------------
     # ✅ CRITICAL: Override get_list_data (PUBLIC METHOD)
@@ -39,41 +50,61 @@ class CrmLeadSpreadsheet(models.Model):
             _logger.info(f"⚪ Not CRM model, using super: {model}")
             return super().get_list_data(model, list_id, field_names)
 
-        try:
-            line_id = int(list_id)
-        except (ValueError, TypeError):
-            _logger.error(f"❌ Invalid list_id: {list_id}")
-            return []
-
-        line = self.env['crm.material.line'].browse(line_id)
-        if not line.exists():
-            _logger.warning(f"❌ Material line {line_id} not found")
-            return []
-
-        _logger.info(f"✅ Found line {line_id}: {line.product_template_id.display_name}")
-
-        # Get attributes_json FIRST
-        attrs = line.attributes_json or {}
-        _logger.info(f"📦 attributes_json: {attrs}")
+        if str(list_id).startswith('layout_') and len(self) == 1:
+            line = self._get_layout_lines(list_id)
+        else:
+            try:
+                line_id = int(list_id)
+            except (ValueError, TypeError):
+                _logger.error(f"❌ Invalid list_id: {list_id}")
+                return []
 
-        row = {"id": line.id}
+            line = self.env['crm.material.line'].browse(line_id)
+            if not line.exists():
+                _logger.warning(f"❌ Material line {line_id} not found")
+                return []
 
-        for field in field_names:
-            if field in line._fields:
-                # Standard Odoo field
-                val = line[field]
-                if hasattr(val, "display_name"):
-                    row[field] = val.display_name
-                else:
-                    row[field] = val
-                _logger.info(f"✅ Standard field '{field}' = '{row[field]}'")
-            else:
-                # Dynamic attribute from attributes_json
-                row[field] = attrs.get(field, "")
-                _logger.info(f"🔵 Dynamic field '{field}' = '{row[field]}'")
+        payload = columnar_values(line, field_names, self._material_line_cell_value)
+        return rows_from_columnar(field_names, payload)
 
-        _logger.info(f"🟡 Final row data: {row}")
-        return [row]
+    @api.model
+    def _material_line_cell_value(self, line, field):
+        """Standard fields by display name, anything else from attributes_json"""
+        if field in line._fields:
+            val = line[field]
+            return val.display_name if hasattr(val, "display_name") else val
+        return (line.attributes_json or {}).get(field, "")
+
+    def get_lists_data(self, list_ids=None):
+        """Columnar data of the material line lists of this spreadsheet in one
+        call: ``{'schemas': [columns, ...], 'lists': {list_id: {'schema',
+        'ids', 'values'}}}``, ``values`` holding one array per column."""
+        self.ensure_one()
+        table = SchemaTable()
+        lists = {}
+        if self.sheet_layout == 'consolidated':
+            for columns, lines in self._group_lines_by_layout(self.lead_id.material_line_ids).items():
+                list_id = f"layout_{self._get_layout_key(columns)}"
+                if list_ids is None or list_id in list_ids:
+                    lists[list_id] = dict(
+                        columnar_values(lines, columns, self._material_line_cell_value),
+                        schema=table.ref(columns),
+                    )
+
+        lines = self.lead_id.material_line_ids
+        if list_ids is not None:
+            wanted = {int(list_id) for list_id in list_ids if str(list_id).isdigit()}
+            lines = lines.filtered(lambda line: line.id in wanted)
+        elif self.sheet_layout == 'consolidated':
+            lines = lines.browse()
+
+        for line in lines:
+            columns = self._get_material_line_columns(line)
+            lists[str(line.id)] = dict(
+                columnar_values(line, columns, self._material_line_cell_value),
+                schema=table.ref(columns),
+            )
+        return {'schemas': table.schemas, 'lists': lists}
 
     # ------------------------------------------------------------------
     # ✅ INTERNAL: _get_list_data (PRIVATE METHOD)
@@ -131,6 +162,9 @@ class CrmLeadSpreadsheet(models.Model):
         records = super().create(vals_list)
         for rec in records:
             if rec.lead_id and rec.lead_id.material_line_ids:
+                if rec.sheet_layout == 'consolidated':
+                    rec._sync_sheets_with_material_lines()
+                    continue
                 for line in rec.lead_id.material_line_ids:
                     rec.with_context(
                         material_line_id=line.id
@@ -162,21 +196,20 @@ class CrmLeadSpreadsheet(models.Model):
         missing_ids = current_line_ids - existing_list_ids
         removed_ids = existing_list_ids - current_line_ids
 
-        # Add sheets
-        for line_id in missing_ids:
-            new_sheet = self._create_sheet_for_material_line(line_id)
-            lists[str(line_id)] = new_sheet['list']
-            sheets.append(new_sheet['sheet'])
+        # Add sheets (consolidated calculators show the lines on their layout sheets)
+        if self.sheet_layout == 'per_line':
+            for line_id in missing_ids:
+                new_sheet = self._create_sheet_for_material_line(line_id)
+                lists[str(line_id)] = new_sheet['list']
+                sheets.append(new_sheet['sheet'])
 
         # Remove sheets
         if removed_ids:
             for rid in removed_ids:
                 if str(rid) in lists:
                     del lists[str(rid)]
-            sheets = [
-                s for s in sheets
-                if not any(str(rid) in json.dumps(s) for rid in removed_ids)
-            ]
+            removed_sheet_ids = {f"sheet_{rid}" for rid in removed_ids}
+            sheets = [s for s in sheets if s.get('id') not in removed_sheet_ids]
 
         spreadsheet_json['lists'] = lists
         spreadsheet_json['sheets'] = sheets
@@ -184,6 +217,8 @@ class CrmLeadSpreadsheet(models.Model):
         # ✅ Preload data for ALL lists
         _logger.info("🔥 Preloading data for all lists...")
         for list_id, list_config in lists.items():
+            if not list_id.isdigit():
+                continue
             try:
                 line_id = int(list_id)
                 line = self.env['crm.material.line'].browse(line_id)
@@ -194,8 +229,10 @@ class CrmLeadSpreadsheet(models.Model):
             except Exception as e:
                 _logger.error(f"❌ Failed to preload list {list_id}: {e}")
 
-        data['data'] = spreadsheet_json
         self.raw_spreadsheet_data = json.dumps(spreadsheet_json)
+        data['data'] = pack_list_columns(spreadsheet_json)
+        # values the field syncs are compared with on save, never stored
+        data['data']['fieldSyncValues'] = self.get_lists_data(list(lists))
 
         return data
 
@@ -272,6 +309,13 @@ class CrmLeadSpreadsheet(models.Model):
         if not self.lead_id or not self.lead_id.material_line_ids:
             return data
 
+        if self.sheet_layout == 'consolidated':
+            for columns, lines in self._group_lines_by_layout(self.lead_id.material_line_ids).items():
+                layout = self._get_layout_sheet(columns, lines)
+                data['sheets'].append(layout['sheet'])
+                data['lists'][layout['list']['id']] = layout['list']
+            return data
+
         for line in self.lead_id.material_line_ids:
             sheet_id = f"sheet_{line.id}"
             list_id = str(line.id)
@@ -306,62 +350,43 @@ class CrmLeadSpreadsheet(models.Model):
         line_id = self._context.get('material_line_id')
         if not line_id:
             return
+        self._dispatch_insert_lists_revision(self.env['crm.material.line'].browse(line_id))
 
-        line = self.env['crm.material.line'].browse(line_id)
-        if not line.exists():
+    def _dispatch_insert_lists_revision(self, lines):
+        """Create the sheets of several material lines in a single revision"""
+        self.ensure_one()
+        lines = lines.exists()
+        if not lines:
             return
 
-        sheet_id = f"sheet_{line.id}"
-        list_id = str(line.id)
-        product_name = (line.product_template_id.display_name or "Item")[:31]
-
-        columns = self._get_material_line_columns(line)
-
-        _logger.info(f"🔧 Creating sheet for line {line_id} with columns: {columns}")
-
-        # ✅ Build column metadata with proper types
-        columns_meta = []
-        for col in columns:
-            if col in self.env['crm.material.line']._fields:
-                ftype = self.env['crm.material.line']._fields[col].type
-            else:
-                # Dynamic attribute - treat as char
-                ftype = 'char'
-            columns_meta.append({'name': col, 'type': ftype})
-
-        # ✅ Get actual data now
-        attrs = line.attributes_json or {}
-        _logger.info(f"📦 Line {line_id} attributes_json: {attrs}")
-
-        # Build the actual row data that will be inserted
-        row_data = []
-        for col_meta in columns_meta:
-            field_name = col_meta['name']
+        commands = []
+        for line in lines:
+            sheet_id = f"sheet_{line.id}"
+            product_name = (line.product_template_id.display_name or "Item")[:31]
+            columns = self._get_material_line_columns(line)
 
-            if field_name in line._fields:
-                # Standard field
-                val = line[field_name]
-                if hasattr(val, 'display_name'):
-                    cell_value = val.display_name
-                else:
-                    cell_value = val if val is not False else ''
-            else:
-                # Dynamic attribute
-                cell_value = attrs.get(field_name, '')
+            _logger.info(f"🔧 Creating sheet for line {line.id} with columns: {columns}")
 
-            row_data.append(cell_value)
-            _logger.info(f"  📝 {field_name} = {cell_value}")
+            commands.extend(self._get_insert_list_commands(
+                sheet_id, product_name, str(line.id), columns, line, [['id', '=', line.id]], [],
+            ))
+        _logger.info(f"📤 Dispatching {len(commands)} commands for {len(lines)} sheet(s)")
+        self._dispatch_commands(commands)
 
+    def _get_insert_list_commands(self, sheet_id, sheet_name, list_id, columns, lines, domain, order_by):
+        """Commands creating ``sheet_id`` with list ``list_id`` inserted at A1,
+        one row per record of ``lines`` (in list order)."""
+        columns_meta = self._get_list_columns_meta(columns)
         commands = [
-            {'type': 'CREATE_SHEET', 'sheetId': sheet_id, 'name': product_name},
+            {'type': 'CREATE_SHEET', 'sheetId': sheet_id, 'name': sheet_name},
             {
                 'type': 'REGISTER_ODOO_LIST',
                 'listId': list_id,
                 'model': 'crm.material.line',
                 'columns': columns,
-                'domain': [['id', '=', line.id]],
+                'domain': domain,
                 'context': {},
-                'orderBy': [],
+                'orderBy': order_by,
             },
             {
                 'type': 'RE_INSERT_ODOO_LIST',
@@ -369,34 +394,11 @@ class CrmLeadSpreadsheet(models.Model):
                 'col': 0,
                 'row': 0,
                 'id': list_id,
-                'linesNumber': 1,
+                'linesNumber': len(lines),
                 'columns': columns_meta,
             },
         ]
-
-        # ✅ Insert actual cell values immediately after creating the list
-        for col_idx, (col_meta, cell_value) in enumerate(zip(columns_meta, row_data)):
-            # 1. Data row
-            commands.append({
-                'type': 'UPDATE_CELL',
-                'sheetId': sheet_id,
-                'col': col_idx,
-                'row': 1,  # Row 1 is data row (Row 0 is header)
-                'content': str(cell_value)
-                if cell_value not in (None, False, '') else '',
-            })
-
-            # 2. Header cleanup (for "__1" style names)
-            field_name = col_meta['name']
-            if "__" in field_name:
-                display_name = field_name.split("__")[0]
-                commands.append({
-                    'type': 'UPDATE_CELL',
-                    'sheetId': sheet_id,
-                    'col': col_idx,
-                    'row': 0,
-                    'content': display_name,
-                })
+        commands.extend(self._get_list_cell_commands(sheet_id, columns_meta, lines))
 
         # Add table formatting
         commands.append({
@@ -405,12 +407,7 @@ class CrmLeadSpreadsheet(models.Model):
             'tableType': 'static',
             'ranges': [{
                 '_sheetId': sheet_id,
-                '_zone': {
-                    'top': 0,
-                    'bottom': 1,
-                    'left': 0,
-                    'right': len(columns_meta) - 1,
-                },
+                '_zone': self._get_list_zone(columns_meta, lines),
             }],
             'config': {
                 'firstColumn': False,
@@ -423,9 +420,222 @@ class CrmLeadSpreadsheet(models.Model):
 
         # Final update command
         commands.append({'type': 'UPDATE_ODOO_LIST_DATA', 'listId': list_id})
+        return commands
+
+    def _get_list_columns_meta(self, columns):
+        """Column metadata of RE_INSERT_ODOO_LIST, dynamic attributes as char"""
+        Line = self.env['crm.material.line']
+        return [
+            {'name': col, 'type': Line._fields[col].type if col in Line._fields else 'char'}
+            for col in columns
+        ]
 
-        _logger.info(f"📤 Dispatching {len(commands)} commands for sheet {sheet_id}")
-        self._dispatch_commands(commands)
+    @api.model
+    def _get_list_zone(self, columns_meta, lines):
+        """Zone of a list inserted at A1: the header row and one row per line"""
+        return {'top': 0, 'bottom': len(lines), 'left': 0, 'right': len(columns_meta) - 1}
+
+    def _get_list_cell_commands(self, sheet_id, columns_meta, lines):
+        """UPDATE_CELL commands writing the values and headers of a list at A1"""
+        commands = []
+        # ✅ Insert actual cell values immediately after creating the list
+        for row_idx, line in enumerate(lines, start=1):  # Row 0 is header
+            attrs = line.attributes_json or {}
+            for col_idx, col_meta in enumerate(columns_meta):
+                field_name = col_meta['name']
+                if field_name in line._fields:
+                    # Standard field
+                    val = line[field_name]
+                    if hasattr(val, 'display_name'):
+                        cell_value = val.display_name
+                    else:
+                        cell_value = val if val is not False else ''
+                else:
+                    # Dynamic attribute
+                    cell_value = attrs.get(field_name, '')
+
+                commands.append({
+                    'type': 'UPDATE_CELL',
+                    'sheetId': sheet_id,
+                    'col': col_idx,
+                    'row': row_idx,
+                    'content': str(cell_value)
+                    if cell_value not in (None, False, '') else '',
+                })
+
+        # Header cleanup (for "__1" style names)
+        for col_idx, col_meta in enumerate(columns_meta):
+            field_name = col_meta['name']
+            if "__" in field_name:
+                commands.append({
+                    'type': 'UPDATE_CELL',
+                    'sheetId': sheet_id,
+                    'col': col_idx,
+                    'row': 0,
+                    'content': field_name.split("__")[0],
+                })
+        return commands
+
+    # ------------------------------------------------------------------
+    # CONSOLIDATED LAYOUT (one sheet per column layout)
+    # ------------------------------------------------------------------
+    def _group_lines_by_layout(self, lines):
+        """{columns tuple: material lines sharing them}, lines ordered by id"""
+        ids_by_columns = {}
+        for line in lines.sorted('id'):
+            columns = tuple(self._get_material_line_columns(line))
+            ids_by_columns.setdefault(columns, []).append(line.id)
+        return {
+            columns: self.env['crm.material.line'].browse(line_ids)
+            for columns, line_ids in ids_by_columns.items()
+        }
+
+    @api.model
+    def _get_layout_key(self, columns):
+        return hashlib.sha1(json.dumps(list(columns)).encode()).hexdigest()[:10]
+
+    def _get_layout_lines(self, list_id):
+        """Material lines currently shown by the consolidated list ``list_id``"""
+        self.ensure_one()
+        for columns, lines in self._group_lines_by_layout(self.lead_id.material_line_ids).items():
+            if list_id == f"layout_{self._get_layout_key(columns)}":
+                return lines
+        return self.env['crm.material.line']
+
+    def _get_layout_sheet(self, columns, lines):
+        """Sheet and list definitions of a consolidated layout.
+
+        The list filters on the lead and the layout key stored on the lines,
+        ordered by id: adding or removing lines of the layout keeps the list
+        and only changes its number of rows.
+        """
+        key = self._get_layout_key(columns)
+        sheet_id = f"sheet_layout_{key}"
+        templates = lines.product_template_id
+        name = templates[:1].display_name or "Items"
+        if len(templates) > 1:
+            name = f"{name[:24]} (+{len(templates) - 1})"
+        name = name[:31]
+        return {
+            'sheet': {'id': sheet_id, 'name': name},
+            'list': {
+                'id': f"layout_{key}",
+                'model': 'crm.material.line',
+                'columns': list(columns),
+                'domain': [['lead_id', '=', self.lead_id.id], ['sheet_layout_key', '=', key]],
+                'sheetId': sheet_id,
+                'name': name,
+                'context': {},
+                'orderBy': [{'name': 'id', 'asc': True}],
+                'fieldMatching': {
+                    'material_line_ids': {'chain': 'lead_id', 'type': 'many2one'},
+                },
+            },
+        }
+
+    def _get_layout_insert_commands(self, columns, lines):
+        layout = self._get_layout_sheet(columns, lines)
+        list_def = layout['list']
+        return self._get_insert_list_commands(
+            layout['sheet']['id'], layout['sheet']['name'], list_def['id'],
+            list_def['columns'], lines, list_def['domain'], list_def['orderBy'],
+        )
+
+    def _get_layout_line_count(self, sheet):
+        """Number of rows of the list at A1 of a layout sheet (header excluded),
+        from its table, else from the filled cells of column A."""
+        for table in sheet.get('tables') or []:
+            match = re.match(r'A1:[A-Z]+(\d+)$', table.get('range') or '')
+            if match:
+                return int(match.group(1)) - 1
+        cells = sheet.get('cells') or {}
+        count = 0
+        while cells.get(f"A{count + 2}"):
+            count += 1
+        return count
+
+    def _get_layout_resize_commands(self, sheet, definition, lines, previous_count):
+        """Commands re-inserting the list of a layout sheet with one row per
+        line of ``lines``, the sheet and the cells around the list kept."""
+        sheet_id = sheet['id']
+        list_id = definition['id']
+        columns_meta = self._get_list_columns_meta(definition['columns'])
+        zone = self._get_list_zone(columns_meta, lines)
+        commands = [{
+            'type': 'RE_INSERT_ODOO_LIST',
+            'sheetId': sheet_id,
+            'col': 0,
+            'row': 0,
+            'id': list_id,
+            'linesNumber': len(lines),
+            'columns': columns_meta,
+        }]
+        commands.extend(self._get_list_cell_commands(sheet_id, columns_meta, lines))
+        if previous_count > len(lines):
+            # rows of the removed lines
+            commands.append({
+                'type': 'DELETE_CONTENT',
+                'sheetId': sheet_id,
+                'target': [dict(zone, top=len(lines) + 1, bottom=previous_count)],
+            })
+        if sheet.get('tables'):
+            commands.append({
+                'type': 'UPDATE_TABLE',
+                'sheetId': sheet_id,
+                'zone': dict(zone, bottom=previous_count),
+                'newTableRange': {'_sheetId': sheet_id, '_zone': zone},
+            })
+        commands.append({'type': 'UPDATE_ODOO_LIST_DATA', 'listId': list_id})
+        return commands
+
+    def _sync_consolidated_layouts(self, current_sheets, current_lists):
+        """Resize the layout lists whose number of lines changed, rebuild the
+        layouts whose columns changed, drop the layouts without lines and the
+        per-line sheets of deleted lines, in a single revision."""
+        expected = {}
+        for columns, lines in self._group_lines_by_layout(self.lead_id.material_line_ids).items():
+            expected[f"layout_{self._get_layout_key(columns)}"] = (columns, lines)
+
+        sheets_by_id = {sheet.get('id'): sheet for sheet in current_sheets}
+        commands = []
+        for list_id, definition in current_lists.items():
+            if not list_id.startswith('layout_'):
+                continue
+            columns, lines = expected.pop(list_id, ((), None))
+            sheet = sheets_by_id.get(definition.get('sheetId') or f"sheet_{list_id}")
+            layout_list = lines is not None and self._get_layout_sheet(columns, lines)['list']
+            if (
+                sheet and layout_list
+                and definition.get('columns') == layout_list['columns']
+                and definition.get('domain') == layout_list['domain']
+            ):
+                previous_count = self._get_layout_line_count(sheet)
+                if previous_count != len(lines):
+                    _logger.info(f"↕️ Layout {list_id} now has {len(lines)} lines. Resizing list.")
+                    commands.extend(self._get_layout_resize_commands(
+                        sheet, definition, lines, previous_count,
+                    ))
+                continue
+            _logger.info(f"♻️ Layout {list_id} changed. Re-creating sheet.")
+            if sheet:
+                commands.append({'type': 'DELETE_SHEET', 'sheetId': sheet['id']})
+            commands.append({'type': 'UNREGISTER_ODOO_LIST', 'listId': list_id})
+            if lines is not None:
+                expected[list_id] = (columns, lines)
+
+        current_line_ids = set(self.lead_id.material_line_ids.ids)
+        for list_id in current_lists:
+            if list_id.isdigit() and int(list_id) not in current_line_ids:
+                if f"sheet_{list_id}" in sheets_by_id:
+                    commands.append({'type': 'DELETE_SHEET', 'sheetId': f"sheet_{list_id}"})
+                commands.append({'type': 'UNREGISTER_ODOO_LIST', 'listId': list_id})
+
+        for columns, lines in expected.values():
+            commands.extend(self._get_layout_insert_commands(columns, lines))
+
+        if commands:
+            _logger.info(f"📤 Dispatching {len(commands)} layout commands for spreadsheet {self.id}")
+            self._dispatch_commands(commands)
 
     # ------------------------------------------------------------------
     # SYNC WITH MATERIAL LINES
@@ -440,24 +650,28 @@ class CrmLeadSpreadsheet(models.Model):
         current_lists = data.get('lists', {})
         current_line_ids = set(self.lead_id.material_line_ids.ids)
 
+        if self.sheet_layout == 'consolidated':
+            self._sync_consolidated_layouts(current_sheets, current_lists)
+            return
+
         # Remove deleted
-        for sheet in current_sheets:
-            sid = sheet.get('id')
-            if sid and sid.startswith("sheet_"):
-                try:
-                    line_id = int(sid.replace("sheet_", ""))
-                    if line_id not in current_line_ids:
-                        self._delete_sheet_for_material_line(line_id)
-                except Exception:
-                    pass
+        deleted_line_ids = [
+            int(sheet['id'][len('sheet_'):])
+            for sheet in current_sheets
+            if (sheet.get('id') or '').startswith('sheet_')
+            and sheet['id'][len('sheet_'):].isdigit()
+            and int(sheet['id'][len('sheet_'):]) not in current_line_ids
+        ]
+        self._delete_sheets_for_material_lines(deleted_line_ids)
 
         # Re-add missing OR update if columns changed
         existing_sheet_ids = {
             int(s['id'].replace('sheet_', ''))
             for s in current_sheets
-            if s.get('id', '').startswith('sheet_')
+            if s.get('id', '').startswith('sheet_') and s['id'][len('sheet_'):].isdigit()
         }
 
+        missing_lines = self.env['crm.material.line']
         for line in self.lead_id.material_line_ids:
             # 2. Check if sheet exists
             if line.id in existing_sheet_ids:
@@ -480,9 +694,9 @@ class CrmLeadSpreadsheet(models.Model):
 
             # 3. Create if missing
             if line.id not in existing_sheet_ids:
-                self.with_context(
-                    material_line_id=line.id
-                )._dispatch_insert_list_revision()
+                missing_lines |= line
+
+        self._dispatch_insert_lists_revision(missing_lines)
 
     # ------------------------------------------------------------------
     # CREATE SHEET STRUCTURE
@@ -521,35 +735,63 @@ class CrmLeadSpreadsheet(models.Model):
     # DELETE SHEET
     # ------------------------------------------------------------------
     def _delete_sheet_for_material_line(self, material_line_id):
-        sheet_id = f"sheet_{material_line_id}"
-        list_id = str(material_line_id)
+        self._delete_sheets_for_material_lines([material_line_id])
 
-        commands = [
-            {'type': 'DELETE_SHEET', 'sheetId': sheet_id},
-            {'type': 'UNREGISTER_ODOO_LIST', 'listId': list_id},
-        ]
+    def _delete_sheets_for_material_lines(self, material_line_ids):
+        """Delete the sheets and lists of several material lines in a single revision"""
+        self.ensure_one()
+        commands = []
+        for line_id in material_line_ids:
+            commands.extend([
+                {'type': 'DELETE_SHEET', 'sheetId': f"sheet_{line_id}"},
+                {'type': 'UNREGISTER_ODOO_LIST', 'listId': str(line_id)},
+            ])
+        if not commands:
+            return
 
         try:
             self._dispatch_commands(commands)
         except Exception:
-            self._cleanup_deleted_sheets_from_data(material_line_id)
+            self._cleanup_deleted_sheets_from_data(material_line_ids)
 
-    def _cleanup_deleted_sheets_from_data(self, material_line_id):
+    def _cleanup_deleted_sheets_from_data(self, material_line_ids):
         if not self.raw_spreadsheet_data:
             return
         try:
             data = json.loads(self.raw_spreadsheet_data)
-            sid = f"sheet_{material_line_id}"
+            sheet_ids = {f"sheet_{line_id}" for line_id in material_line_ids}
             if 'sheets' in data:
                 data['sheets'] = [
-                    s for s in data['sheets'] if s.get('id') != sid
+                    s for s in data['sheets'] if s.get('id') not in sheet_ids
                 ]
-            if 'lists' in data and str(material_line_id) in data['lists']:
-                del data['lists'][str(material_line_id)]
+            for line_id in material_line_ids:
+                data.get('lists', {}).pop(str(line_id), None)
             self.raw_spreadsheet_data = json.dumps(data)
         except Exception:
             pass
 
+    # ------------------------------------------------------------------
+    # FIELD SYNC SAVE
+    # ------------------------------------------------------------------
+    def save_field_sync_changes(self, changes):
+        """Apply the field sync values changed in the calculator.
+
+        :param dict changes: {material_line_id: {field: value}}, only the
+            fields whose value differs from the one loaded at join
+        :return: number of material lines updated
+        """
+        self.ensure_one()
+        lead_line_ids = set(self.lead_id.material_line_ids.ids)
+        vals_by_id = {
+            int(line_id): vals
+            for line_id, vals in (changes or {}).items()
+            if vals and int(line_id) in lead_line_ids
+        }
+        if vals_by_id:
+            _logger.info(f"💾 Saving {len(vals_by_id)} changed material lines from spreadsheet {self.id}")
+            self.env['crm.material.line']._write_grouped(vals_by_id)
+        return len(vals_by_id)
+
     # ------------------------------------------------------------------
     # MANUAL SYNC BUTTON
     # ------------------------------------------------------------------
@@ -606,21 +848,32 @@ class CrmLeadSpreadsheet(models.Model):
         return rows
 
     def getMainCrmMaterialLineLists(self):
+        """Material line lists, their columns in a shared ``schemas`` table"""
         self.ensure_one()
         if not self.lead_id or not self.lead_id.material_line_ids:
-            return []
+            return {'schemas': [], 'lists': []}
 
+        table = SchemaTable()
         lists = []
-        for line in self.lead_id.material_line_ids:
-            columns = self._get_material_line_columns(line)
+        if self.sheet_layout == 'consolidated':
+            for columns, lines in self._group_lines_by_layout(self.lead_id.material_line_ids).items():
+                layout = self._get_layout_sheet(columns, lines)
+                lists.append({
+                    'id': layout['list']['id'],
+                    'model': 'crm.material.line',
+                    'columnSchema': table.ref(columns),
+                    'name': layout['list']['name'],
+                    'sheetId': layout['sheet']['id'],
+                })
+            return {'schemas': table.schemas, 'lists': lists}
 
+        for line in self.lead_id.material_line_ids:
             lists.append({
                 'id': str(line.id),
                 'model': 'crm.material.line',
-                'field_names': columns,
-                'columns': columns,
+                'columnSchema': table.ref(self._get_material_line_columns(line)),
                 'name': line.product_template_id.display_name or f"Item {line.id}",
                 'sheetId': f"sheet_{line.id}",
             })
 
-        return lists
+        return {'schemas': table.schemas, 'lists': lists}
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""Column-oriented encoding of spreadsheet list payloads.
+
+Lists of a calculator share a handful of column sets, and row dicts repeat
+every field name for every row. Payloads sent to the client therefore carry
+each column set once in a ``schemas`` table referenced by index, and list
+values as parallel arrays (one array per column). The client decodes them
+with ``unpackListColumns`` / ``decodeColumnarRows`` from
+``field_sync/list_payload.js``.
+"""
+
+
+class SchemaTable:
+    """Deduplicate column sets, handing out their index in ``schemas``."""
+
+    def __init__(self):
+        self.schemas = []
+        self._index = {}
+
+    def ref(self, columns):
+        key = tuple(columns)
+        if key not in self._index:
+            self._index[key] = len(self.schemas)
+            self.schemas.append(list(columns))
+        return self._index[key]
+
+
+def pack_list_columns(spreadsheet_json):
+    """Replace the ``columns`` of every list by a ``columnSchema`` reference
+    to ``spreadsheet_json['columnSchemas']``, in place."""
+    lists = spreadsheet_json.get('lists') or {}
+    table = SchemaTable()
+    for list_config in lists.values():
+        if not isinstance(list_config, dict) or not isinstance(list_config.get('columns'), list):
+            continue
+        list_config['columnSchema'] = table.ref(list_config.pop('columns'))
+    if table.schemas:
+        spreadsheet_json['columnSchemas'] = table.schemas
+    return spreadsheet_json
+
+
+def columnar_values(records, field_names, read_value):
+    """Read ``field_names`` of ``records`` as one array of values per field."""
+    return {
+        'ids': records.ids,
+        'values': [[read_value(record, field) for record in records] for field in field_names],
+    }
+
+
+def rows_from_columnar(field_names, payload):
+    """Decode a columnar payload back into the legacy list of row dicts."""
+    rows = [{'id': record_id} for record_id in payload['ids']]
+    for field, values in zip(field_names, payload['values']):
+        for row, value in zip(rows, values):
+            row[field] = value
+    return rows
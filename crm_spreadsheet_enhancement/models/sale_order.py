@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+from odoo import api, models, _
+from odoo.exceptions import UserError
+import logging
+import threading
+
+from psycopg2 import errors
+
+_logger = logging.getLogger(__name__)
+
+
+class SaleOrder(models.Model):
+    _inherit = 'sale.order'
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        """Build the calculators of orders created from an opportunity that
+        has a CRM spreadsheet."""
+        orders = super().create(vals_list)
+        ctx = self.env.context
+        crm_lead_id = ctx.get('crm_lead_id')
+        # Build the calculators once the orders are committed
+        if orders and ctx.get('crm_has_spreadsheet') and crm_lead_id:
+            orders._schedule_crm_spreadsheets(crm_lead_id)
+        return orders
+
+    def _schedule_crm_spreadsheets(self, crm_lead_id):
+        """Create the sales calculators of `self` from the CRM spreadsheet of
+        `crm_lead_id` after the current transaction commits, in their own
+        transaction, so order creation never commits halfway."""
+        if getattr(threading.current_thread(), 'testing', False):
+            self._create_crm_spreadsheets(crm_lead_id)
+            return
+
+        registry = self.env.registry
+        uid, context, order_ids = self.env.uid, self.env.context, self.ids
+
+        @self.env.cr.postcommit.add
+        def create_spreadsheets():
+            with registry.cursor() as cr:
+                env = api.Environment(cr, uid, context)
+                env['sale.order'].browse(order_ids)._create_crm_spreadsheets(crm_lead_id)
+
+    def _create_crm_spreadsheets(self, crm_lead_id):
+        """Idempotent: orders that already have a calculator are skipped.
+
+        A concurrent run cannot see calculators created after its snapshot
+        was taken; the unique order_id index of sale.order.spreadsheet makes
+        its creation fail instead, and the order is skipped then.
+        """
+        crm_lead = self.env['crm.lead'].browse(crm_lead_id).exists()
+        orders = self.exists()
+        if not crm_lead or not orders:
+            _logger.warning(f"⚠️ CRM Lead {crm_lead_id} or orders {self.ids} not found")
+            return
+
+        done = self.env['sale.order.spreadsheet'].search([('order_id', 'in', orders.ids)]).order_id
+        for order in orders - done:
+            try:
+                with self.env.cr.savepoint():
+                    spreadsheet = crm_lead._create_sales_spreadsheet_with_data(order)
+                if spreadsheet:
+                    _logger.info(f"✅ Spreadsheet {spreadsheet.id} created for order {order.id}")
+                else:
+                    _logger.warning(f"⚠️ Spreadsheet creation returned False for order {order.id}")
+            except Exception as e:
+                # ✅ FIX 7: Don't fail order creation if spreadsheet fails
+                _logger.error(f"❌ Spreadsheet creation error for order {order.id}: {e}", exc_info=True)
+    
+    def _create_order_spreadsheet(self, vals):
+        """Create the calculator of the order.
+
+        When a concurrent transaction created one first, the unique order_id
+        index rejects ours and the committed calculator is returned instead.
+        That record is read from a fresh cursor and is not visible in the
+        current transaction snapshot: only hand its id to the client.
+        """
+        self.ensure_one()
+        try:
+            with self.env.cr.savepoint():
+                return self.env['sale.order.spreadsheet'].create(dict(vals, order_id=self.id))
+        except errors.UniqueViolation:
+            with self.env.registry.cursor() as cr:
+                cr.execute("SELECT id FROM sale_order_spreadsheet WHERE order_id = %s", [self.id])
+                row = cr.fetchone()
+            if not row:
+                raise
+            _logger.info(f"🔄 Calculator {row[0]} of order {self.id} was created concurrently")
+            return self.env['sale.order.spreadsheet'].browse(row[0])
+
+    def action_open_spreadsheet_common(self):
+        """
+        Open or create Sale Order spreadsheet
+
+        Orders whose calculator was not built at creation (the scheduled run
+        failed or never ran) get it converted from the opportunity here.
+        """
+        self.ensure_one()
+        
+        _logger.info(f"\n🔵 [OPEN SPREADSHEET] Sale Order: {self.id}, Name: {self.name}")
+        
+        # ✅ FIX 8: Always search for existing spreadsheet first
+        spreadsheet = self.env['sale.order.spreadsheet'].search([
+            ('order_id', '=', self.id)
+        ], limit=1)
+        
+        if spreadsheet and spreadsheet.exists():
+            _logger.info(f"✅ Found existing spreadsheet {spreadsheet.id}")
+            return spreadsheet.action_open_spreadsheet()
+        
+        # ✅ FIX 9: Check if we have an opportunity with spreadsheet
+        if self.opportunity_id:
+            _logger.info(f"🔄 Checking opportunity {self.opportunity_id.id} for spreadsheet")
+            
+            crm_spreadsheet = self.env['crm.lead.spreadsheet'].search([
+                ('lead_id', '=', self.opportunity_id.id),
+                ('raw_spreadsheet_data', '!=', False)
+            ], limit=1)
+            
+            if crm_spreadsheet and crm_spreadsheet.exists():
+                _logger.info(f"🔄 Found CRM spreadsheet {crm_spreadsheet.id}, converting...")
+                
+                try:
+                    # Convert CRM data to Sales format
+                    sales_data_json = self.opportunity_id._convert_crm_spreadsheet_to_sales(
+                        crm_spreadsheet, self
+                    )
+                    
+                    if sales_data_json:
+                        # Create new spreadsheet with converted data
+                        spreadsheet = self._create_order_spreadsheet({
+                            'name': f"{self.name} - Calculator",
+                            **self.env['sale.order.spreadsheet']._get_converted_document_vals(
+                                sales_data_json
+                            ),
+                        })
+                        
+                        _logger.info(f"✅ Created spreadsheet {spreadsheet.id} from CRM data")
+                        return spreadsheet.action_open_spreadsheet()
+                    else:
+                        _logger.warning("⚠️ Conversion returned empty data")
+                        
+                except Exception as e:
+                    _logger.error(f"❌ Error converting CRM spreadsheet: {e}", exc_info=True)
+                    # Continue to create empty spreadsheet
+        
+        # ✅ FIX 10: Create empty spreadsheet as fallback
+        _logger.info("📝 Creating new empty spreadsheet")
+        
+        try:
+            spreadsheet = self._create_order_spreadsheet({
+                'name': f"{self.name} - Calculator",
+            })
+            
+            _logger.info(f"✅ Created empty spreadsheet {spreadsheet.id}")
+            return spreadsheet.action_open_spreadsheet()
+            
+        except Exception as e:
+            _logger.error(f"❌ Failed to create spreadsheet: {e}", exc_info=True)
+            raise UserError(_("Failed to create calculator: %s") % str(e))
@@ -5,6 +5,8 @@ from odoo.exceptions import UserError
 import json
 import logging
 
+from .list_payload import SchemaTable, columnar_values, pack_list_columns, rows_from_columnar
+
 _logger = logging.getLogger(__name__)
 
 SALES_ORDER_LINE_FIELDS = [
@@ -17,15 +19,30 @@ SALES_ORDER_LINE_FIELDS = [
     'thickness',
 ]
 
+# Version of the sales document layout written by _convert_crm_sheet_to_sales
+SALES_DOCUMENT_SCHEMA_VERSION = 1
+CRM_DOCUMENT_MARKERS = ('"crm_', 'sheet_crm_', 'crm.material.line')
+
 class SaleOrderSpreadsheet(models.Model):
     _name = 'sale.order.spreadsheet'
-    _inherit = 'spreadsheet.mixin'
+    _inherit = ['spreadsheet.mixin', 'crm.spreadsheet.storage.mixin']
     _description = 'Sales Order Spreadsheet'
 
     name = fields.Char(required=True)
     order_id = fields.Many2one('sale.order', ondelete='set null')
     company_id = fields.Many2one('res.company', default=lambda self: self.env.company)
-    raw_spreadsheet_data = fields.Text("Raw Spreadsheet Data")
+    document_format = fields.Selection(
+        [('crm', "CRM"), ('sales', "Sales"), ('converted', "Converted from CRM")],
+        string="Document Format",
+        copy=False,
+        readonly=True,
+        help="Layout of the stored document, empty until it has been checked once.",
+    )
+    document_schema_version = fields.Integer(string="Document Schema Version", copy=False, readonly=True)
+
+    _sql_constraints = [
+        ('order_id_uniq', 'UNIQUE(order_id)', "A sales order can only have one calculator."),
+    ]
 
     # ✅ CRITICAL: Override get_list_data for Sales
     @api.model
@@ -51,22 +68,42 @@ class SaleOrderSpreadsheet(models.Model):
             _logger.warning(f"❌ Sale order line {line_id} not found")
             return []
 
-        _logger.info(f"✅ Found sale line {line_id}: {line.product_id.display_name}")
-        
-        row = {"id": line.id}
-
-        for field in field_names:
-            if field in line._fields:
-                val = line[field]
-                if hasattr(val, "display_name"):
-                    row[field] = val.display_name
-                else:
-                    row[field] = val
-                _logger.info(f"✅ Sale field '{field}' = '{row[field]}'")
-            else:
-                row[field] = ""
+        payload = columnar_values(line, field_names, self._order_line_cell_value)
+        return rows_from_columnar(field_names, payload)
+
+    @api.model
+    def _order_line_cell_value(self, line, field):
+        if field not in line._fields:
+            return ""
+        val = line[field]
+        return val.display_name if hasattr(val, "display_name") else val
+
+    def get_lists_data(self, list_ids=None):
+        """Columnar data of the order line lists of this spreadsheet in one
+        call: ``{'schemas': [columns, ...], 'lists': {list_id: {'schema',
+        'ids', 'values'}}}``, ``values`` holding one array per column."""
+        self.ensure_one()
+        lines = self.order_id.order_line
+        if list_ids is not None:
+            wanted = {
+                int(str(list_id).replace('sales_', ''))
+                for list_id in list_ids
+                if str(list_id).replace('sales_', '').isdigit()
+            }
+            lines = lines.filtered(lambda line: line.id in wanted)
 
-        return [row]
+        table = SchemaTable()
+        schema = table.ref(SALES_ORDER_LINE_FIELDS)
+        return {
+            'schemas': table.schemas,
+            'lists': {
+                f"sales_{line.id}": dict(
+                    columnar_values(line, SALES_ORDER_LINE_FIELDS, self._order_line_cell_value),
+                    schema=schema,
+                )
+                for line in lines
+            },
+        }
 
     def get_formview_action(self, access_uid=None):
         return self.action_open_spreadsheet()
@@ -84,15 +121,47 @@ class SaleOrderSpreadsheet(models.Model):
         }
 
     # ✅ CRITICAL FIX: Convert CRM field syncs to Sales field syncs
+    def write(self, vals):
+        # a document written without its format has to be checked again
+        if 'raw_spreadsheet_data' in vals and 'document_format' not in vals:
+            vals = dict(vals, document_format=False, document_schema_version=0)
+        return super().write(vals)
+
+    @api.model
+    def _get_converted_document_vals(self, data_json):
+        """Values storing a document converted from a CRM calculator, with its
+        format, so it is never scanned for CRM markers on join"""
+        return {
+            'raw_spreadsheet_data': data_json,
+            'document_format': 'converted',
+            'document_schema_version': SALES_DOCUMENT_SCHEMA_VERSION,
+        }
+
+    def _get_document_format(self):
+        """Persisted document format, detected once for documents stored
+        without one"""
+        self.ensure_one()
+        if self.document_format or not self.raw_spreadsheet_data:
+            return self.document_format
+        document_format = 'crm' if any(
+            marker in self.raw_spreadsheet_data for marker in CRM_DOCUMENT_MARKERS
+        ) else 'sales'
+        self.write({
+            'document_format': document_format,
+            'document_schema_version': SALES_DOCUMENT_SCHEMA_VERSION if document_format == 'sales' else 0,
+        })
+        return document_format
+
     def _convert_crm_sheet_to_sales(self):
-        """Convert CRM field syncs and lists to Sales format"""
+        """Convert CRM field syncs and lists to Sales format, returns the
+        converted document"""
         if not self.raw_spreadsheet_data:
-            return
+            return None
 
         try:
             data = json.loads(self.raw_spreadsheet_data)
         except Exception:
-            return
+            return None
 
         lists = data.get('lists', {}) or {}
         sheets = data.get('sheets', []) or []
@@ -195,10 +264,16 @@ class SaleOrderSpreadsheet(models.Model):
         data['sheets'] = new_sheets
 
         try:
-            self.raw_spreadsheet_data = json.dumps(data)
+            self.write({
+                'raw_spreadsheet_data': json.dumps(data),
+                'document_format': 'converted',
+                'document_schema_version': SALES_DOCUMENT_SCHEMA_VERSION,
+            })
             _logger.info("✅ Successfully converted CRM spreadsheet to Sales format")
         except Exception as e:
             _logger.error(f"❌ Failed to save converted data: {e}")
+            return None
+        return data
 
     def _sync_order_lines_from_crm(self, crm_lead):
         """Sync order lines from CRM material lines"""
@@ -234,18 +309,14 @@ class SaleOrderSpreadsheet(models.Model):
         _logger.info(f"\n🟢 [SALES SESSION] Starting for {self.name}")
 
         # ✅ CRITICAL: Convert CRM data first
-        converted_from_crm = False
-        if self.raw_spreadsheet_data:
-            crm_detected = any(marker in self.raw_spreadsheet_data 
-                             for marker in ['"crm_', 'sheet_crm_', 'crm.material.line'])
-            if crm_detected:
-                _logger.info("🔄 Converting CRM data to Sales format...")
-                self._convert_crm_sheet_to_sales()
-                converted_from_crm = True
-                _logger.info("✅ Conversion completed")
+        converted_json = None
+        if self._get_document_format() == 'crm':
+            _logger.info("🔄 Converting CRM data to Sales format...")
+            converted_json = self._convert_crm_sheet_to_sales()
+            _logger.info("✅ Conversion completed")
 
         # Sync sheets if needed
-        should_sync = not self.raw_spreadsheet_data or converted_from_crm
+        should_sync = not self.raw_spreadsheet_data or converted_json is not None
         if should_sync:
             try:
                 self._sync_sheets_with_order_lines()
@@ -255,43 +326,26 @@ class SaleOrderSpreadsheet(models.Model):
         # Get base data
         data = super().join_spreadsheet_session(access_token)
         
-        # Load spreadsheet data
-        spreadsheet_json = {}
-        if self.raw_spreadsheet_data:
+        # Load spreadsheet data, the converted document is already parsed
+        spreadsheet_json = converted_json
+        if spreadsheet_json is None and self.raw_spreadsheet_data:
             try:
                 spreadsheet_json = json.loads(self.raw_spreadsheet_data)
-                _logger.info(f"📊 Loaded: {len(spreadsheet_json.get('lists', {}))} lists")
             except Exception as e:
                 _logger.error(f"❌ Data load error: {e}")
-                spreadsheet_json = data.get('data') or {}
-        else:
+        if spreadsheet_json is None:
             spreadsheet_json = data.get('data') or {}
 
-        # ✅ CRITICAL: Preload data for ALL sales lists
-        lists = spreadsheet_json.get('lists', {})
-        for list_id, list_config in lists.items():
-            try:
-                if list_id.startswith('sales_'):
-                    line_id = int(list_id.replace('sales_', ''))
-                else:
-                    line_id = int(list_id)
-                    
-                line = self.env['sale.order.line'].browse(line_id)
-                if line.exists():
-                    columns = list_config.get('columns', [])
-                    list_data = self.get_list_data('sale.order.line', list_id, columns)
-                    _logger.info(f"✅ Preloaded sales list {list_id}")
-            except Exception as e:
-                _logger.error(f"❌ Failed to preload {list_id}: {e}")
-
-        data['data'] = spreadsheet_json
+        data['data'] = pack_list_columns(spreadsheet_json)
+        # values the field syncs are compared with on save, never stored
+        data['data']['fieldSyncValues'] = self.get_lists_data(list(spreadsheet_json.get('lists') or {}))
         
         # Add sales context
         data.update({
             'order_id': self.order_id.id if self.order_id else False,
             'order_display_name': self.order_id.display_name if self.order_id else False,
             'sale_order_id': self.order_id.id if self.order_id else False,
-            'sheet_id': self.id
+            'sheet_id': self.id,
         })
 
         _logger.info(f"🟢 [SALES SESSION] Completed\n")
@@ -509,18 +563,41 @@ class SaleOrderSpreadsheet(models.Model):
         return {'sheet': sheet_data, 'list': list_data}
 
     def write_spreadsheet_data(self, data_json):
-        """Save spreadsheet data"""
+        """Save the full spreadsheet document"""
         self.ensure_one()
-
-        try:
-            data = json.loads(data_json)
-        except Exception:
+        if not data_json:
             return True
-
-        self.raw_spreadsheet_data = data_json
-        _logger.info(f"✅ Saved: {len(data.get('lists', {}))} lists, {len(data.get('sheets', []))} sheets")
+        # cheap sanity check, the document is not parsed on save
+        if data_json.lstrip()[:1] != '{':
+            _logger.error("❌ Save refused, the payload is not a spreadsheet document")
+            raise UserError(_("The spreadsheet could not be saved: the document is invalid."))
+
+        # client saves keep the layout they were loaded with
+        self.write({'raw_spreadsheet_data': data_json, 'document_format': self.document_format})
+        _logger.info(f"✅ Saved {len(data_json)} bytes")
         return True
 
+    def save_field_sync_changes(self, changes):
+        """Apply the field sync values changed in the spreadsheet, one write
+        per distinct set of values.
+
+        :param dict changes: {order_line_id: {field: value}}
+        :return: number of order lines updated
+        """
+        self.ensure_one()
+        order_line_ids = set(self.order_id.order_line.ids)
+        ids_by_vals = {}
+        for line_id, vals in (changes or {}).items():
+            if vals and int(line_id) in order_line_ids:
+                key = repr(sorted(vals.items()))
+                ids_by_vals.setdefault(key, (vals, []))[1].append(int(line_id))
+
+        for vals, line_ids in ids_by_vals.values():
+            self.env['sale.order.line'].browse(line_ids).write(vals)
+        updated = sum(len(line_ids) for _vals, line_ids in ids_by_vals.values())
+        _logger.info(f"💾 Saved {updated} changed order lines from spreadsheet {self.id}")
+        return updated
+
     @api.model
     def _get_spreadsheet_selector(self):
         return {
@@ -531,19 +608,23 @@ class SaleOrderSpreadsheet(models.Model):
         }
 
     def getMainSalesOrderLineLists(self):
-        """Return sales order line lists"""
+        """Sales order line lists, their columns in a shared ``schemas`` table"""
         self.ensure_one()
         if not self.order_id or not self.order_id.order_line:
-            return []
+            return {'schemas': [], 'lists': []}
 
-        return [
-            {
-                'id': f"sales_{line.id}",
-                'model': 'sale.order.line',
-                'field_names': SALES_ORDER_LINE_FIELDS,
-                'columns': SALES_ORDER_LINE_FIELDS,
-                'name': line.product_id.display_name or f"Sales Item {line.id}",
-                'sheetId': f"sheet_sales_{line.id}",
-            }
-            for line in self.order_id.order_line
-        ]
\ No newline at end of file
+        table = SchemaTable()
+        schema = table.ref(SALES_ORDER_LINE_FIELDS)
+        return {
+            'schemas': table.schemas,
+            'lists': [
+                {
+                    'id': f"sales_{line.id}",
+                    'model': 'sale.order.line',
+                    'columnSchema': schema,
+                    'name': line.product_id.display_name or f"Sales Item {line.id}",
+                    'sheetId': f"sheet_sales_{line.id}",
+                }
+                for line in self.order_id.order_line
+            ],
+        }
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+import base64
+import binascii
+import logging
+import zlib
+
+from odoo import api, fields, models, _
+from odoo.exceptions import UserError
+
+_logger = logging.getLogger(__name__)
+
+# Stored documents are framed as <format byte><payload>, kept base64 encoded
+# by the Binary field.
+STORAGE_FORMAT_ZLIB = 1
+COMPRESSION_LEVEL = 6
+
+
+def compress_document(text):
+    """Frame and compress a spreadsheet document for storage."""
+    if not text:
+        return False
+    payload = zlib.compress(text.encode('utf-8'), COMPRESSION_LEVEL)
+    return base64.b64encode(bytes([STORAGE_FORMAT_ZLIB]) + payload)
+
+
+def decompress_document(value):
+    """Return the document text of a stored frame, False when empty.
+
+    A frame that exists but cannot be decoded raises a UserError: reading it
+    as an empty document would let the next save overwrite it.
+    """
+    if not value:
+        return False
+    try:
+        frame = base64.b64decode(value)
+    except (binascii.Error, ValueError) as e:
+        _logger.error(f"❌ Unreadable spreadsheet document frame: {e}")
+        raise UserError(_("The spreadsheet document is corrupted and cannot be opened."))
+    if not frame:
+        return False
+    storage_format, payload = frame[0], frame[1:]
+    if storage_format != STORAGE_FORMAT_ZLIB:
+        _logger.error(f"❌ Unknown spreadsheet storage format {storage_format}")
+        raise UserError(_("The spreadsheet document is corrupted and cannot be opened."))
+    try:
+        return zlib.decompress(payload).decode('utf-8')
+    except (zlib.error, UnicodeDecodeError) as e:
+        _logger.error(f"❌ Corrupt spreadsheet document frame: {e}")
+        raise UserError(_("The spreadsheet document is corrupted and cannot be opened."))
+
+
+class CrmSpreadsheetStorageMixin(models.AbstractModel):
+    _name = 'crm.spreadsheet.storage.mixin'
+    _description = 'Compressed Spreadsheet Document Storage'
+
+    raw_spreadsheet_data = fields.Text(
+        "Raw Spreadsheet Data",
+        compute='_compute_raw_spreadsheet_data',
+        inverse='_inverse_raw_spreadsheet_data',
+        search='_search_raw_spreadsheet_data',
+    )
+    raw_spreadsheet_data_compressed = fields.Binary(
+        "Compressed Spreadsheet Data",
+        attachment=False,
+    )
+
+    @api.depends('raw_spreadsheet_data_compressed')
+    def _compute_raw_spreadsheet_data(self):
+        for record in self:
+            record.raw_spreadsheet_data = decompress_document(record.raw_spreadsheet_data_compressed)
+
+    def _inverse_raw_spreadsheet_data(self):
+        for record in self:
+            record.raw_spreadsheet_data_compressed = compress_document(record.raw_spreadsheet_data)
+
+    def _search_raw_spreadsheet_data(self, operator, value):
+        if operator in ('=', '!=') and not value:
+            return [('raw_spreadsheet_data_compressed', operator, False)]
+        raise UserError(_("Spreadsheet documents can only be filtered on whether they are set."))
@@ -7,6 +7,7 @@ import { AbstractSpreadsheetAction } from "@spreadsheet_edition/bundle/actions/a
 import { useSubEnv } from "@odoo/owl";
 import { useService } from "@web/core/utils/hooks";
 import { useSpreadsheetFieldSyncExtension } from "../field_sync_extension_hook";
+import { unpackListColumns } from "../list_payload";
 
 export class SpreadsheetFieldSyncAction extends AbstractSpreadsheetAction {
     static template = "crm_customisation.CrmLeadSpreadsheetAction";
@@ -75,21 +76,23 @@ export class SpreadsheetFieldSyncAction extends AbstractSpreadsheetAction {
 
             console.log(`💾 [${this.spreadsheetType.toUpperCase()}] Saving ${commands.length} commands`);
             
-            // ✅ Process commands based on spreadsheet type
-            if (this.spreadsheetType === 'crm' && this.leadId) {
-                console.log(`💾 Writing to crm.lead ${this.leadId}`);
-                await this.orm.write("crm.lead", [this.leadId], {
-                    material_line_ids: commands,
-                });
-                
-            } else if (this.spreadsheetType === 'sale' && this.saleOrderId) {
-                console.log(`💾 Writing to sale.order ${this.saleOrderId}`);
-                await this.orm.write("sale.order", [this.saleOrderId], {
-                    order_line: commands,
-                });
-            } else {
+            // ✅ Only changed records and fields are sent, applied server
+            // side in one grouped write
+            const changes = {};
+            for (const [, recordId, values] of commands) {
+                changes[recordId] = { ...changes[recordId], ...values };
+            }
+
+            if (!this.spreadsheetId || !this.currentRecordId) {
                 throw new Error(`No valid parent record found. Type: ${this.spreadsheetType}, LeadId: ${this.leadId}, OrderId: ${this.saleOrderId}`);
             }
+            if (commands.length) {
+                console.log(`💾 Writing ${commands.length} changed records through ${this._resModel} ${this.spreadsheetId}`);
+                await this.orm.call(this._resModel, "save_field_sync_changes", [
+                    [this.spreadsheetId],
+                    changes,
+                ]);
+            }
        
             this.notificationService.add(
                 _t("Successfully saved %s changes", commands.length), 
@@ -111,6 +114,7 @@ export class SpreadsheetFieldSyncAction extends AbstractSpreadsheetAction {
      * ✅ CRITICAL FIX: Initialize with backend data and set model
      */
     _initializeWith(data) {
+        unpackListColumns(data.data);
         super._initializeWith(data);
         
         console.log("🔵 [INIT] Received data:", data);
@@ -81,7 +81,10 @@ export function addSpreadsheetFieldSyncExtensionWithCleanUp(cleanUpHook = () =>
                     col: position.col,
                     row: position.row,
                     listId: targetList.id,
-                    indexInList: 0,
+                    // row 0 is the list header, one record per row below it
+                    indexInList: targetList.sheetId === position.sheetId
+                        ? Math.max(position.row - 1, 0)
+                        : 0,
                     fieldName: "quantity",
                 });
             }
@@ -0,0 +1,50 @@
+/** @odoo-module **/
+
+/**
+ * Decoders for the column-oriented list payloads built server side
+ * (see models/list_payload.py).
+ */
+
+/**
+ * Restore the `columns` of every list from the shared `columnSchemas` table,
+ * in place, so o-spreadsheet receives regular list definitions.
+ */
+export function unpackListColumns(spreadsheetData) {
+    const schemas = spreadsheetData?.columnSchemas;
+    if (!schemas) {
+        return spreadsheetData;
+    }
+    for (const list of Object.values(spreadsheetData.lists || {})) {
+        if (list && list.columnSchema !== undefined && !list.columns) {
+            list.columns = [...(schemas[list.columnSchema] || [])];
+            delete list.columnSchema;
+        }
+    }
+    delete spreadsheetData.columnSchemas;
+    return spreadsheetData;
+}
+
+/**
+ * Decode `{ ids, values }` (one array per column) into row objects.
+ */
+export function decodeColumnarRows(fieldNames, payload) {
+    const rows = payload.ids.map((id) => ({ id }));
+    fieldNames.forEach((fieldName, colIndex) => {
+        const values = payload.values[colIndex] || [];
+        rows.forEach((row, rowIndex) => {
+            row[fieldName] = values[rowIndex];
+        });
+    });
+    return rows;
+}
+
+/**
+ * Decode the result of `get_lists_data` into `{ [listId]: rows }`.
+ */
+export function decodeListsData({ schemas, lists }) {
+    const result = {};
+    for (const [listId, payload] of Object.entries(lists || {})) {
+        result[listId] = decodeColumnarRows(schemas[payload.schema] || [], payload);
+    }
+    return result;
+}
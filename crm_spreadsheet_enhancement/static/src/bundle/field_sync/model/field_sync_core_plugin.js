@@ -1,5 +1,6 @@
 import { CommandResult, helpers } from "@odoo/o-spreadsheet";
 import { OdooCorePlugin } from "@spreadsheet/plugins";
+import { decodeListsData } from "../list_payload";
 
 const { positionToZone, toCartesian, toXC } = helpers;
 
@@ -27,9 +28,13 @@ export class FieldSyncCorePlugin extends OdooCorePlugin {
         "getCurrentSpreadsheetModel",
         "getDynamicFieldsForList",
         "getModelFields", // ✅ NEW: Get all fields including dynamic ones
+        "isFieldSyncValueChanged",
     ];
 
     fieldSyncs = {};
+    // Record values loaded at join ({ [recordId]: { [fieldName]: value } }).
+    // Local to this session: neither part of the history nor exported.
+    loadedValues = null;
 
     allowDispatch(cmd) {
         switch (cmd.type) {
@@ -264,6 +269,23 @@ export class FieldSyncCorePlugin extends OdooCorePlugin {
         return fieldSyncs;
     }
 
+    /**
+     * Whether `value` differs from the value of the record field loaded at
+     * join. Without loaded values every field is considered changed.
+     */
+    isFieldSyncValueChanged(recordId, fieldName, value) {
+        const record = this.loadedValues?.[recordId];
+        if (!record || !(fieldName in record)) {
+            return true;
+        }
+        const loaded = record[fieldName];
+        if (typeof value === "number" && loaded !== "" && loaded !== false && loaded !== null) {
+            return Number(loaded) !== value;
+        }
+        const normalize = (v) => (v === false || v === null || v === undefined ? "" : String(v));
+        return normalize(loaded) !== normalize(value);
+    }
+
     getFieldSync(position) {
         const { sheetId, col, row } = position;
         return this.fieldSyncs?.[sheetId]?.[col]?.[row] ?? undefined;
@@ -301,6 +323,15 @@ export class FieldSyncCorePlugin extends OdooCorePlugin {
 
     import(data) {
         let totalImported = 0;
+
+        if (data.fieldSyncValues) {
+            this.loadedValues = {};
+            for (const rows of Object.values(decodeListsData(data.fieldSyncValues))) {
+                for (const { id, ...values } of rows) {
+                    this.loadedValues[id] = { ...this.loadedValues[id], ...values };
+                }
+            }
+        }
         
         for (const sheet of data.sheets || []) {
             if (!sheet.fieldSyncs) {
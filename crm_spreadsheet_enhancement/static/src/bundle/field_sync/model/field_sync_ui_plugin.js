@@ -72,6 +72,14 @@ export class FieldSyncUIPlugin extends OdooUIPlugin {
                 }
             }
 
+            if (!recordId && list.model === 'crm.material.line') {
+                // Consolidated layout lists filter on the layout key: read the
+                // record of the row from the loaded list data
+                const dataSource = this.getters.getListDataSource(listId);
+                await dataSource.load();
+                recordId = dataSource.getIdFromPosition(indexInList) || null;
+            }
+
             if (!recordId) {
                 console.error(`❌ No record ID found in domain for list ${listId}`);
                 console.error(`Domain was:`, domain);
@@ -109,17 +117,9 @@ export class FieldSyncUIPlugin extends OdooUIPlugin {
 
                 console.log(`📋 Processing list: ${list.id} (${list.name}) from sheet: ${list.sheetId}`);
 
-                const recordId = await this.getRecordIdFromList(list.id, 0);
-                
-                if (!recordId) {
-                    console.error(`❌ No record ID for list ${list.id}, skipping`);
-                    errors.push(`No record found for list ${list.id}`);
-                    continue;
-                }
-
-                console.log(`✅ List ${list.id} -> Record ID: ${recordId}`);
-
-                const recordUpdates = {};
+                // Consolidated lists hold one record per row: group the
+                // field syncs of the list by their index in it
+                const updatesByIndex = {};
                 const allFieldSyncs = [...this.getters.getAllFieldSyncs()];
                 
                 for (const [position, fieldSync] of allFieldSyncs) {
@@ -146,15 +146,39 @@ export class FieldSyncUIPlugin extends OdooUIPlugin {
                         serverValue = cell.formattedValue || cell.value || "";
                     }
                     
-                    recordUpdates[fieldName] = serverValue;
+                    const index = fieldSync.indexInList || 0;
+                    updatesByIndex[index] = updatesByIndex[index] || {};
+                    updatesByIndex[index][fieldName] = serverValue;
                     console.log(`📝 Field ${fieldName} = ${serverValue} from sheet: ${position.sheetId}`);
                 }
 
-                if (Object.keys(recordUpdates).length > 0) {
+                if (Object.keys(updatesByIndex).length === 0) {
+                    console.log(`⚠️ No updates for list ${list.id}`);
+                    continue;
+                }
+
+                for (const [index, syncedValues] of Object.entries(updatesByIndex)) {
+                    const recordId = await this.getRecordIdFromList(list.id, parseInt(index));
+
+                    if (!recordId) {
+                        console.error(`❌ No record ID for list ${list.id} row ${index}, skipping`);
+                        errors.push(`No record found for list ${list.id}`);
+                        continue;
+                    }
+
+                    // Only send the fields that differ from the values loaded at join
+                    const recordUpdates = {};
+                    for (const [fieldName, value] of Object.entries(syncedValues)) {
+                        if (this.getters.isFieldSyncValueChanged(recordId, fieldName, value)) {
+                            recordUpdates[fieldName] = value;
+                        }
+                    }
+                    if (Object.keys(recordUpdates).length === 0) {
+                        continue;
+                    }
+
                     commands.push(x2ManyCommands.update(recordId, recordUpdates));
                     console.log(`✅ Command created for record ${recordId}:`, recordUpdates);
-                } else {
-                    console.log(`⚠️ No updates for list ${list.id}`);
                 }
             }
 
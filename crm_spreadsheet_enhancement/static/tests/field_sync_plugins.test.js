@@ -17,6 +17,7 @@ import {
     setCellContent,
 } from "@spreadsheet/../tests/helpers/commands";
 import { getCellContent } from "@spreadsheet/../tests/helpers/getters";
+import { createModelWithDataSource } from "@spreadsheet/../tests/helpers/model";
 import { mailModels } from "@mail/../tests/mail_test_helpers";
 import { defineModels, onRpc } from "@web/../tests/web_test_helpers";
 import {
@@ -26,7 +27,11 @@ import {
 } from "./helpers/commands";
 import { addSpreadsheetFieldSyncExtensionWithCleanUp } from "../src/bundle/field_sync/field_sync_extension_hook";
 import { getFieldSync } from "./helpers/getters";
-import { SaleOrderLine, defineSpreadsheetSaleModels } from "./helpers/data";
+import {
+    SaleOrderLine,
+    defineSpreadsheetSaleModels,
+    getSaleOrderSpreadsheetData,
+} from "./helpers/data";
 
 describe.current.tags("headless");
 
@@ -425,4 +430,23 @@ describe("field sync plugins", () => {
             "Multiple cells are updating the same field of the same record! Unable to determine which one to choose: A1, A2",
         ]);
     });
+
+    test("only values changed since join are dirty", async () => {
+        const model = await createModelWithDataSource({
+            spreadsheetData: {
+                ...getSaleOrderSpreadsheetData(),
+                fieldSyncValues: {
+                    schemas: [["product_uom_qty", "name"]],
+                    lists: { 1: { schema: 0, ids: [42, 43], values: [[5, 0], ["Desk", ""]] } },
+                },
+            },
+        });
+        expect(model.getters.isFieldSyncValueChanged(42, "product_uom_qty", 5)).toBe(false);
+        expect(model.getters.isFieldSyncValueChanged(42, "product_uom_qty", 6)).toBe(true);
+        expect(model.getters.isFieldSyncValueChanged(42, "name", "Desk")).toBe(false);
+        expect(model.getters.isFieldSyncValueChanged(43, "name", "Chair")).toBe(true);
+        // fields and records not loaded at join are always sent
+        expect(model.getters.isFieldSyncValueChanged(42, "price_unit", 1)).toBe(true);
+        expect(model.getters.isFieldSyncValueChanged(44, "product_uom_qty", 5)).toBe(true);
+    });
 });